@@ -0,0 +1,29 @@
+"""
+Micro-benchmarks for the per query costs of wikipediabase. They run
+offline on small canned inputs so the numbers are comparable between
+revisions. Run a suite with eg
+
+    python -m benchmarks.parsing
+"""
+
+import timeit
+
+
+def bench(name, fn, number=1000, repeat=3):
+    """
+    Print and return the best time per call of fn in microseconds.
+    """
+
+    best = min(timeit.repeat(fn, number=number, repeat=repeat))
+    usec = best / number * 1e6
+    print "%-45s %10.2f us/call" % (name, usec)
+    return usec
+
+
+def run(benchmarks, number=1000):
+    """
+    Run a list of (name, fn) benchmarks.
+    """
+
+    return [(name, bench(name, fn, number=number))
+            for name, fn in benchmarks]
@@ -0,0 +1,57 @@
+"""
+Benchmarks of reading infobox dates, the template fast path against
+overlay_parse. The values are the markup of the birth and death dates
+of some of the people in tests/examples.py.
+
+    python -m benchmarks.dates
+"""
+
+from wikipediabase import dates
+
+from benchmarks import run
+
+VALUES = [
+    u"{{birth date and age|1946|8|19}}",                 # Bill Clinton
+    u"{{birth date and age|1961|8|4}}",                  # Barack Obama
+    u"{{birth date|1913|10|25|df=y}}",                   # Klaus Barbie
+    u"{{death date and age|1991|9|23|1913|10|25|df=y}}",
+    u"{{birth date|1769|8|15|df=y}}",                    # Napoleon
+    u"{{death date and age|1821|5|5|1769|8|15|df=y}}",
+    u"{{Birth date|1736|2|7|df=yes}}",
+    u"{{birth date and age|mf=yes|1943|4|29}}",
+    u"{{Birth-date|1879|3|14}}",                         # Albert Einstein
+    u"{{death_date_and_age|1955|4|18|1879|3|14}}",
+    u"{{bda|1968|10|14}}",
+    u"{{start date|1929}}",
+    u"c. 1564",
+    u"26 April 1564 (baptised)",
+    u"December 1666",
+]
+
+
+def coverage():
+    """
+    The fraction of VALUES the fast path reads.
+    """
+
+    return sum(dates.template_date(v) is not None
+               for v in VALUES) / float(len(VALUES))
+
+
+def benchmarks():
+    def parse_all(fn):
+        return lambda: [fn(v) for v in VALUES]
+
+    def overlay(v):
+        dates._CACHE.clear()
+        return dates.just_props(v, {'date'}, {'range'})
+
+    return [
+        ("template_date", parse_all(dates.template_date)),
+        ("just_props (uncached)", parse_all(overlay)),
+    ]
+
+
+if __name__ == "__main__":
+    print "template_date coverage: %.0f%%" % (coverage() * 100)
+    run(benchmarks(), number=100)
@@ -0,0 +1,27 @@
+"""
+Benchmarks of parsing queries with edn_format and with the query
+parser of the frontend.
+
+    python -m benchmarks.edn
+"""
+
+from edn_format import loads
+
+from wikipediabase.query_parser import fast_loads, parse_query
+
+from benchmarks import run
+from benchmarks.frontend import NESTED, QUERY
+
+
+def benchmarks():
+    return [
+        ("edn_format.loads", lambda: loads(QUERY)),
+        ("edn_format.loads (nested)", lambda: loads(NESTED)),
+        ("query_parser.fast_loads", lambda: fast_loads(QUERY)),
+        ("query_parser.fast_loads (nested)", lambda: fast_loads(NESTED)),
+        ("query_parser.parse_query", lambda: parse_query(QUERY)),
+    ]
+
+
+if __name__ == "__main__":
+    run(benchmarks())
@@ -0,0 +1,41 @@
+"""
+Benchmarks of the overhead of evaluating a query in the frontend when
+the answer itself is already cached.
+
+    python -m benchmarks.frontend
+"""
+
+from edn_format import Symbol
+
+from wikipediabase.frontend import Frontend
+from wikipediabase.lispify import lispify
+from wikipediabase.provider import Provider, provide
+
+from benchmarks import run
+
+QUERY = u'(get "wikipedia-person" "Bill Clinton" (:code "BIRTH-DATE"))'
+NESTED = u'(get "wikipedia-person" (get "wikipedia-person" "Bill Clinton" ' \
+    u'(:code "SPOUSE")) (:code "BIRTH-DATE"))'
+
+
+class CachedAnswers(Provider):
+
+    @provide(name='get')
+    def get(self, cls, symbol, attr):
+        return lispify([symbol])
+
+
+def benchmarks():
+    fe = Frontend()
+    fe.acquire_from(CachedAnswers())
+    get = Symbol('get')
+
+    return [
+        ("Frontend.get_callable", lambda: fe.get_callable(get)),
+        ("Frontend.eval", lambda: fe.eval(QUERY)),
+        ("Frontend.eval (nested)", lambda: fe.eval(NESTED)),
+    ]
+
+
+if __name__ == "__main__":
+    run(benchmarks())
@@ -0,0 +1,36 @@
+"""
+Benchmarks of lispifying answers, eg a large get-attributes response.
+
+    python -m benchmarks.lispify
+"""
+
+from wikipediabase.lispify import dump, lispify
+
+from benchmarks import run
+
+ATTRIBUTES = [dict(code=("ATTRIBUTE%d" % i).upper(),
+                   rendered=("Attribute %d" % i) if i % 3 else None)
+              for i in xrange(300)]
+
+
+class NullFile(object):
+
+    def write(self, data):
+        pass
+
+
+def benchmarks():
+    return [
+        ("lispify(string)", lambda: lispify(u"Bill Clinton")),
+        ("lispify(keyword)", lambda: lispify(u":masculine",
+                                             typecode='calculated')),
+        ("lispify(number)", lambda: lispify(42)),
+        ("lispify get-attributes",
+         lambda: unicode(lispify(ATTRIBUTES)).encode('utf-8')),
+        ("dump get-attributes",
+         lambda: dump(lispify(ATTRIBUTES), NullFile())),
+    ]
+
+
+if __name__ == "__main__":
+    run(benchmarks(), number=100)
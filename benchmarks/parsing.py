@@ -0,0 +1,77 @@
+"""
+Benchmarks of the regex heavy parsing functions.
+
+    python -m benchmarks.parsing
+"""
+
+from wikipediabase.article import Article
+from wikipediabase.fetcher import StaticFetcher
+from wikipediabase.infobox import Infobox, InfoboxScraper
+from wikipediabase.lispify import LispString
+from wikipediabase.resolvers.person import PersonResolver
+from wikipediabase.util import markup_unlink, string_reduce
+
+from benchmarks import run
+
+INFOBOX_MARKUP = u"""{{Infobox officeholder
+| name          = Bill Clinton
+| image         = 44 Bill Clinton 3x4.jpg
+| order         = 42nd
+| office        = President of the United States
+| vicepresident = [[Al Gore]]
+| term_start    = January 20, 1993
+| term_end      = January 20, 2001
+| predecessor   = [[George H. W. Bush]]
+| successor     = [[George W. Bush]]
+| birth_name    = William Jefferson Blythe III
+| birth_date    = {{birth date and age|1946|8|19}}
+| birth_place   = [[Hope, Arkansas]], U.S.
+| party         = [[Democratic Party (United States)|Democratic]]
+| spouse        = [[Hillary Clinton|Hillary Rodham]] (1975-present)
+}}
+"""
+
+ARTICLE_MARKUP = (u"{{Use mdy dates|date=March 2016}}\n" +
+                  INFOBOX_MARKUP +
+                  u"'''William Jefferson Clinton''' is an American "
+                  u"politician. {{citation needed}}\n" * 20)
+
+PARAGRAPH = (u"He was born in Hope, Arkansas and his mother was a nurse. "
+             u"They moved to Hot Springs where he attended school and "
+             u"she remarried. It was there that his interest in music "
+             u"and politics started; their family was not wealthy. ")
+
+ARTICLE_HTML = (u'<html><body><h1 id="firstHeading">Bill Clinton</h1>'
+                u'<div id="mw-content-text">' +
+                u"".join(u"<p>%s</p>" % (PARAGRAPH * 3) for _ in range(30)) +
+                u'</div></body></html>')
+
+LINKED = u"[[Hillary Clinton|Hillary Rodham]] and [[Chelsea Clinton]][1]"
+
+
+def benchmarks():
+    scraper = InfoboxScraper("Bill Clinton")
+    article = Article("Bill Clinton",
+                      fetcher=StaticFetcher(ARTICLE_HTML, ARTICLE_MARKUP))
+    article.paragraphs()
+    resolver = PersonResolver(fetcher=article.fetcher)
+    lisp_string = LispString(LINKED, None)
+
+    return [
+        ("Infobox.template",
+         lambda: Infobox("Bill Clinton", INFOBOX_MARKUP, None).template()),
+        ("Infobox.markup_parsed",
+         lambda: Infobox("Bill Clinton", INFOBOX_MARKUP, None).markup_parsed()),
+        ("InfoboxScraper._markup_infoboxes",
+         lambda: scraper._markup_infoboxes(ARTICLE_MARKUP)),
+        ("util.string_reduce",
+         lambda: string_reduce(u'The "Reckoning" (band), of course!')),
+        ("util.markup_unlink", lambda: markup_unlink(LINKED)),
+        ("LispString.val_str", lisp_string.val_str),
+        ("PersonResolver._guess_gender",
+         lambda: resolver._guess_gender(article)),
+    ]
+
+
+if __name__ == "__main__":
+    run(benchmarks())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_article_stats
+----------------------------------
+
+Tests for `article_stats` module.
+"""
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from wikipediabase.article import Article
+from wikipediabase.article_stats import (count_pronouns,
+                                         proper_name,
+                                         text_stats)
+from wikipediabase.fetcher import StaticFetcher
+from wikipediabase.resolvers.person import PersonResolver
+
+HTML = u"""<html><body><div id="mw-content-text">
+<p>Batman is a fictional superhero. He was created by Bob Kane.</p>
+<p>His secret identity is Bruce Wayne. Batman has no powers.</p>
+</div></body></html>"""
+
+
+class RecordingFetcher(StaticFetcher):
+
+    def __init__(self, html):
+        super(RecordingFetcher, self).__init__(html=html)
+        self.records = {}
+
+    def get_record(self, symbol, domain):
+        return self.records.get((symbol, domain))
+
+    def set_record(self, symbol, domain, record, **kwargs):
+        self.records[(symbol, domain)] = record
+
+
+class TestArticleStats(unittest.TestCase):
+
+    def test_count_pronouns(self):
+        paragraphs = ["He said his name was Bob.", "She told him. Theirs."]
+        self.assertEqual(count_pronouns(paragraphs),
+                         dict(masculine=3, feminine=1, neuter=1))
+
+        # "This" and "hershey" are not pronouns
+        self.assertEqual(count_pronouns(["This hershey"]),
+                         dict(masculine=0, feminine=0, neuter=0))
+
+        # Stops before the second paragraph
+        self.assertEqual(count_pronouns(paragraphs, margin=2),
+                         dict(masculine=2, feminine=0, neuter=0))
+
+    def test_proper_name(self):
+        self.assertEqual(proper_name("Batman_(1989_film)"), "Batman")
+
+    def test_text_stats(self):
+        paragraphs = [u"Batman is a superhero. He was created by Bob Kane.",
+                      u"His secret identity is Bruce Wayne."]
+        stats = text_stats(u"<p>Batman. batman</p>", paragraphs, u"Batman")
+
+        self.assertEqual(stats['words'], 4)
+        self.assertEqual(stats['paragraphs'], [50, 35])
+        self.assertEqual(stats['pronouns'],
+                         dict(masculine=2, feminine=0, neuter=0))
+        self.assertEqual(stats['verbs'], dict(singular=2, plural=0))
+        self.assertEqual(stats['occurrences'], {u"Batman": [1, 1, 1]})
+
+    def test_article_stats(self):
+        fetcher = RecordingFetcher(HTML)
+        article = Article("Batman", fetcher=fetcher)
+
+        stats = article.stats()
+        self.assertEqual(stats['pronouns']['masculine'], 2)
+        self.assertIs(fetcher.records[("Batman", 'stats')], stats)
+        self.assertEqual(article.occurrences(u"Batman"), [0, 0, 2])
+        self.assertEqual(article.occurrences(u"Wayne"), [0, 0, 1])
+        self.assertIn(u"Wayne", fetcher.records[("Batman", 'stats')]
+                      ['occurrences'])
+
+        # Kept by the article, not read back each time
+        fetcher.records.clear()
+        self.assertEqual(article.stats()['pronouns']['masculine'], 2)
+        self.assertEqual(article.occurrences(u"Wayne"), [0, 0, 1])
+        self.assertEqual(fetcher.records, {})
+
+    def test_guess_gender_record(self):
+        fetcher = RecordingFetcher(HTML)
+        resolver = PersonResolver(fetcher=fetcher)
+        self.assertEqual(resolver._guess_gender("Batman"), 'masculine')
+        stats = fetcher.records[("Batman", 'stats')]
+        self.assertEqual(stats['pronouns']['masculine'], 2)
+
+        # Another fetcher with the same records reads them back
+        # instead of counting
+        stats['pronouns'] = dict(masculine=0, feminine=1, neuter=0)
+        other = RecordingFetcher(HTML)
+        other.records = fetcher.records
+        resolver = PersonResolver(fetcher=other)
+        self.assertEqual(resolver._guess_gender("Batman"), 'feminine')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_dates
+----------------------------------
+
+Tests for `dates` module.
+"""
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+import os
+import tempfile
+
+import overlay_parse
+
+from wikipediabase import dates
+
+TEXT = u"Bill Clinton (born William Jefferson Blythe III; 1946-08-19)"
+
+
+class TestDates(unittest.TestCase):
+
+    def setUp(self):
+        dates._CACHE.clear()
+
+    def test_no_hint(self):
+        self.assertEqual(dates.just_dates(u"William Jefferson Blythe"), [])
+
+    def test_cached(self):
+        expected = list(overlay_parse.dates.just_props(TEXT, {'date'},
+                                                       {'range'}))
+        self.assertEqual(dates.just_props(TEXT, {'date'}, {'range'}),
+                         expected)
+        self.assertEqual(dates.just_props(TEXT, {'date'}, {'range'}),
+                         expected)
+
+    def test_persistent(self):
+        filename = os.path.join(tempfile.mkdtemp(), "dates")
+        dates.persist_dates(filename)
+        try:
+            expected = dates.just_dates(TEXT)
+            dates._CACHE.clear()
+            self.assertEqual(dates.just_dates(TEXT), expected)
+        finally:
+            dates.persist_dates(None)
+
+    def test_template_date(self):
+        self.assertEqual(
+            dates.template_date(u"{{birth date and age|1946|8|19}}"),
+            (19, 8, 1946))
+        self.assertEqual(
+            dates.template_date(u"{{Death_date and age|df=y|1991|9|23|"
+                                u"1913|10|25}}"),
+            (23, 9, 1991))
+        self.assertEqual(dates.template_date(u"{{bda|1961|08|04}}"),
+                         (4, 8, 1961))
+        self.assertEqual(dates.template_date(u"{{start date|1929}}"),
+                         (0, 0, 1929))
+
+    def test_template_date_fallback(self):
+        self.assertIsNone(dates.template_date(u"August 19, 1946"))
+        self.assertIsNone(dates.template_date(u"{{birth date|1946|13|19}}"))
+        self.assertIsNone(
+            dates.template_date(u"{{birth date|1946|August|19}}"))
+        self.assertIsNone(dates.template_date(u"{{birth year|1946}}"))
+
+    def tearDown(self):
+        pass
+
+if __name__ == '__main__':
+    unittest.main()
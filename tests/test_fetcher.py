@@ -17,6 +17,24 @@ import re
 from wikipediabase import fetcher
 
 
+class MissingFetcher(fetcher.CachingFetcher):
+
+    asked = 0
+
+    def urlopen(self, url, params):
+        self.asked += 1
+        return u'{"query": {"pages": {"-1": {"missing": ""}}}}'
+
+
+class RevisionFetcher(fetcher.CachingFetcher):
+
+    scans = 0
+
+    def html_source(self, symbol, **kwargs):
+        self.scans += 1
+        return u'<script>"wgRevisionId":123,</script>'
+
+
 class TestFetcher(unittest.TestCase):
 
     def setUp(self):
@@ -42,5 +60,37 @@ class TestFetcher(unittest.TestCase):
         src = self.fetcher.markup_source("Obama")
         self.assertFalse(re.match(fetcher.REDIRECT_REGEX, src))
 
+    def test_canonical_title(self):
+        title = self.fetcher.canonical_title("Template:Infobox president")
+        self.assertEqual(title, "Template:Infobox officeholder")
+
+    def test_canonical_title_missing(self):
+        self.assertRaises(LookupError, self.fetcher.canonical_title,
+                          "Template:Infobox no such thing at all")
+
+    def test_canonical_title_missing_cached(self):
+        f = MissingFetcher()
+        dkey = u"title:wikipediabase test missing"
+        f.redis.delete(dkey)
+        try:
+            for _ in range(2):
+                self.assertRaises(fetcher.MissingArticle, f.canonical_title,
+                                  "wikipediabase test missing")
+
+            self.assertEqual(f.asked, 1)
+        finally:
+            f.redis.delete(dkey)
+
+    def test_revision_cached(self):
+        f = RevisionFetcher()
+        dkey = u"article:wikipediabase test revision"
+        f.redis.delete(dkey)
+        try:
+            self.assertEqual(f.revision("wikipediabase test revision"), 123)
+            self.assertEqual(f.revision("wikipediabase test revision"), 123)
+            self.assertEqual(f.scans, 1)
+        finally:
+            f.redis.delete(dkey)
+
 if __name__ == '__main__':
     unittest.main()
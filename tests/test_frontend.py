@@ -13,14 +13,23 @@ try:
 except ImportError:
     import unittest
 
+import StringIO
+
+from wikipediabase.lispify import lispify
 from wikipediabase.provider import Provider
-from wikipediabase.frontend import Frontend
+from wikipediabase.frontend import Frontend, TelnetFrontend
 
 
 def get_attribute(x, y):
     return "%s of '%s'" % (str(repr(y)), str(x))
 
 
+class Unprintable(object):
+
+    def __repr__(self):
+        raise ValueError("unprintable")
+
+
 class TestFrontend(unittest.TestCase):
 
     def setUp(self):
@@ -37,6 +46,31 @@ class TestFrontend(unittest.TestCase):
             '(get "wikipedia-military-conflict" "World War I" (:code "DATE"))')
         self.assertEqual(date, '((:yyyymmdd 19140728))')
 
+    def test_batch(self):
+        self.assertEqual(
+            self.simple_fe.eval('(batch (get "a" x) (nothing) (get "b" y))'),
+            u'("Symbol(x) of \'a\'" '
+            u'(:error KeyError :message "nothing") '
+            u'"Symbol(y) of \'b\'")')
+
+    def test_telnet_stream_error(self):
+        fe = TelnetFrontend(port=0, providers=[Provider(resources={
+            "small": lambda: lispify([Unprintable()]),
+            "big": lambda: lispify([u"x" * 10000, Unprintable()])})])
+        try:
+            # Nothing was written, the answer is just the error
+            fd = StringIO.StringIO()
+            fe.stream('(small)', fd)
+            self.assertEqual(fd.getvalue(), '((:error ValueError '
+                             ':message "unprintable"))\n')
+
+            # Half an answer was written, give up on the connection
+            fd = StringIO.StringIO()
+            self.assertRaises(ValueError, fe.stream, '(big)', fd)
+            self.assertNotIn('error', fd.getvalue())
+        finally:
+            fe.srv.server_close()
+
     def tearDown(self):
         pass
 
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_httpserver
+----------------------------------
+
+Tests for `httpserver` module.
+"""
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+import httplib
+import json
+import threading
+
+from wikipediabase.httpserver import HttpServer
+
+
+def answer(msg):
+    return unicode(json.dumps({"query": msg}))
+
+
+class TestHttpServer(unittest.TestCase):
+
+    def setUp(self):
+        self.srv = HttpServer(('127.0.0.1', 0), answer, workers=2)
+        self.port = self.srv.server_address[1]
+        self.thread = threading.Thread(target=self.srv.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.conn = httplib.HTTPConnection("127.0.0.1", self.port, timeout=5)
+
+    def request(self, *args, **kw):
+        self.conn.request(*args, **kw)
+        res = self.conn.getresponse()
+        return res.status, json.loads(res.read())
+
+    def test_keep_alive(self):
+        self.assertEqual(self.request("GET", "/?q=%28get%20a%29"),
+                         (200, {"query": "(get a)"}))
+        self.assertEqual(self.request("POST", "/", "(get b)"),
+                         (200, {"query": "(get b)"}))
+
+    def test_batch(self):
+        status, answers = self.request(
+            "POST", "/", json.dumps(["(get a)", "(get b)"]),
+            {"Content-Type": "application/json"})
+        self.assertEqual(answers, [{"query": "(get a)"}, {"query": "(get b)"}])
+
+    def test_bad_request(self):
+        self.assertEqual(self.request("GET", "/")[0], 400)
+        self.assertEqual(self.request("POST", "/", "{",
+                                      {"Content-Type": "application/json"})[0],
+                         400)
+
+    def test_not_utf8(self):
+        self.assertEqual(self.request("GET", "/?q=%28get%20%FF%29"),
+                         (400, {"error": "Expected utf-8"}))
+        self.assertEqual(self.request("POST", "/", "(get \xff)"),
+                         (400, {"error": "Expected utf-8"}))
+
+    def test_bad_content_length(self):
+        self.conn.putrequest("POST", "/")
+        self.conn.putheader("Content-Length", "many")
+        self.conn.endheaders()
+        res = self.conn.getresponse()
+        self.assertEqual((res.status, json.loads(res.read())),
+                         (400, {"error": "Invalid Content-Length"}))
+
+    def tearDown(self):
+        self.conn.close()
+        self.srv.shutdown()
+        self.thread.join()
+        self.srv.server_close()
+
+if __name__ == '__main__':
+    unittest.main()
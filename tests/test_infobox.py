@@ -13,6 +13,8 @@ try:
 except ImportError:
     import unittest
 
+import json
+
 from wikipediabase.util import get_article, get_infoboxes
 from wikipediabase import fetcher
 from wikipediabase.infobox import Infobox
@@ -117,5 +119,29 @@ class TestInfobox(unittest.TestCase):
         self.assertEqual(martial_artist_ibox.get('image'),
                          'Vladimir Putin in Japan 3-5 September 2000-22.jpg')
 
+    def test_record(self):
+        ibox = get_infoboxes("AC/DC", fetcher=self.fetcher)[0]
+        record = json.loads(json.dumps(ibox.to_record()))
+        rebuilt = Infobox.from_record("AC/DC", record)
+        self.assertEqual(rebuilt.template(), ibox.template())
+        self.assertEqual(rebuilt.wikipedia_class(), ibox.wikipedia_class())
+        self.assertEqual(rebuilt.html_parsed(), ibox.html_parsed())
+        self.assertEqual(rebuilt.get("origin"), ibox.get("origin"))
+        self.assertEqual(rebuilt.rendered(), ibox.rendered())
+
+    def test_record_lazy_rendered_attributes(self):
+        ibox = Infobox("Foo", "{{Infobox person\n| name = Foo\n}}",
+                       "<table class='infobox'><tr><th>Name</th>"
+                       "<td>Foo</td></tr></table>")
+        record = ibox.to_record()
+        self.assertIs(record['rendered_attributes'], None)
+        self.assertFalse(hasattr(Infobox.from_record("Foo", record),
+                                 '_rendered_attributes'))
+
+        ibox._rendered_attributes = {'name': u"Name"}
+        record = json.loads(json.dumps(ibox.to_record()))
+        self.assertEqual(Infobox.from_record("Foo", record).get("name"),
+                         u"Foo")
+
 if __name__ == '__main__':
     unittest.main()
@@ -13,6 +13,9 @@ try:
 except ImportError:
     import unittest
 
+import os
+import tempfile
+
 from wikipediabase import infobox_tree
 from .common import read_data
 
@@ -38,6 +41,22 @@ class TestInfoboxTree(unittest.TestCase):
         self.assertNotIn("party", tree["state gun laws"])
         self.assertIn(u'Other politics and government', tree["state gun laws"])
 
+    def test_snapshot(self):
+        fd, fname = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        tree = dict(infobox_tree.ibx_tree(MU, ["Artsy stuff"]))
+
+        infobox_tree.save_ibx_type_tree(tree, fname)
+        loaded, age = infobox_tree.load_ibx_type_tree(fname)
+        os.remove(fname)
+
+        self.assertEqual(loaded, tree)
+        self.assertLess(age, 60)
+
+    def test_snapshot_missing(self):
+        self.assertEqual(infobox_tree.load_ibx_type_tree("/no/such/file"),
+                         (None, None))
+
     def tearDown(self):
         pass
 
@@ -29,6 +29,14 @@ class TestKnowledgebase(unittest.TestCase):
     def test_get(self):
         self.assertEquals(self.fe.resources()['get'], self.kb.get)
 
+    def test_get_many(self):
+        f = self.fe.resources()['get-many']
+        birth, death = f("wikipedia-president", "Bill Clinton",
+                         "birth-date", "death-date").val
+        get = self.kb.get("wikipedia-president", "Bill Clinton", "birth-date")
+        self.assertEqual(unicode(birth), unicode(get.val[0]))
+        self.assertIn("Currently alive", unicode(death))
+
     def test_get_attributes(self):
         f = self.fe.resources()['get-attributes']
         self.assertIn("BIRTH-DATE", f("wikipedia-president", "Bill Clinton"))
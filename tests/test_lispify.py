@@ -13,7 +13,10 @@ try:
 except ImportError:
     import unittest
 
-from wikipediabase.lispify import lispify
+import StringIO
+
+from wikipediabase import lispify as lispify_module
+from wikipediabase.lispify import dump, lispify
 
 
 class TestLispify(unittest.TestCase):
@@ -124,5 +127,38 @@ class TestLispify(unittest.TestCase):
         self.assertEqual(lispify(5, typecode='calculated'),
                          '(:calculated 5)')
 
+    def test_iter_chunks(self):
+        for val in [[1, u"föø", [{"a": [2]}, None]], {"a": 1, "b": None},
+                    KeyError("a")]:
+            lisp = lispify(val, typecode="code")
+            self.assertEqual(u''.join(lisp.iter_chunks()), unicode(lisp))
+
+    def test_dump(self):
+        val = [{"code": "A%d" % i, "rendered": u"ü"} for i in xrange(100)]
+        fd = StringIO.StringIO()
+        tee = []
+        dump(lispify(val), fd, tee=tee, bufsize=64)
+        self.assertEqual(fd.getvalue().decode('utf-8'), unicode(lispify(val)))
+        self.assertEqual(u''.join(tee), unicode(lispify(val)))
+
+    def test_to_json(self):
+        self.assertEqual(lispify('foo [1]').to_json(), u'foo ')
+        self.assertEqual(lispify("foo", typecode="code").to_json(),
+                         {"code": "foo"})
+        self.assertEqual(lispify([1, "a", None, True]).to_json(),
+                         [1, "a", None, True])
+        self.assertEqual(lispify({"a": [1], "b": None}).to_json(),
+                         {"a": [1]})
+        self.assertEqual(lispify((19, 8, 1946), typecode='yyyymmdd').to_json(),
+                         {"yyyymmdd": "19460819"})
+        self.assertEqual(lispify(KeyError("a"), typecode='error').to_json(),
+                         {"error": {"symbol": "KeyError", "message": "a"}})
+
+    def test_unknown_typecode_not_cached(self):
+        self.assertEqual(lispify("foo", typecode="anything-1"),
+                         '(:anything-1 "foo")')
+        self.assertFalse([k for k in lispify_module._DISPATCH
+                          if k[1] == "anything-1"])
+
 if __name__ == '__main__':
     unittest.main()
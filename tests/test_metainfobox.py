@@ -13,7 +13,11 @@ try:
 except ImportError:
     import unittest
 
-from wikipediabase.metainfobox import MetaInfobox
+import os
+import tempfile
+
+from wikipediabase.fetcher import StaticFetcher
+from wikipediabase.metainfobox import MetaInfobox, MetaInfoboxCatalog
 from wikipediabase.util import get_meta_infobox
 
 
@@ -57,5 +61,44 @@ class TestMetaInfobox(unittest.TestCase):
         self.assertEqual(self.ibx.rendered_attributes()['native_name'],
                          u'Native\xa0name')
 
+
+class TestMetaInfoboxCatalog(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        # Keep away from the real catalog
+        self.redis_key = u"metainfobox:catalog:test:%d" % os.getpid()
+        self.catalog = MetaInfoboxCatalog(self.filename,
+                                          redis_key=self.redis_key)
+
+    def test_build(self):
+        template = 'Template:Infobox musical artist'
+        self.catalog.build([template])
+        self.assertEqual(self.catalog.get(template)['origin'], "Origin")
+
+        # A fresh catalog reads the file
+        catalog = MetaInfoboxCatalog(self.filename, redis_key=self.redis_key)
+        self.assertEqual(catalog.get(template)['origin'], "Origin")
+
+    def test_empty(self):
+        class NoFetcher(StaticFetcher):
+            def canonical_title(self, symbol, **kwargs):
+                raise AssertionError("Asked for the title of %s" % symbol)
+
+        catalog = MetaInfoboxCatalog(self.filename, fetcher=NoFetcher(),
+                                     redis_key=self.redis_key)
+        self.assertTrue(catalog.empty())
+        self.assertIs(catalog.get('Template:Infobox president'), None)
+
+    def test_redirect(self):
+        self.catalog.build(['Template:Infobox officeholder'])
+        attrs = self.catalog.get('Template:Infobox president')
+        self.assertEqual(attrs.get("death_place"), "Died")
+
+    def tearDown(self):
+        os.remove(self.filename)
+        self.catalog.redis.delete(self.redis_key)
+
 if __name__ == '__main__':
     unittest.main()
@@ -14,7 +14,16 @@ except ImportError:
     import unittest
 
 import common
-from wikipediabase.provider import Acquirer, Provider
+from wikipediabase.provider import Acquirer, Provider, provide
+from wikipediabase.util import request_context, request_memoized
+
+
+class ListProvider(Provider):
+
+    @request_memoized
+    @provide(name='list')
+    def list(self, n):
+        return range(n)
 
 
 class TestProvider(unittest.TestCase):
@@ -32,6 +41,25 @@ class TestProvider(unittest.TestCase):
             self.aq.resources(),
             {"string": "Just a string", "func": self.double})
 
+    def test_late_provision(self):
+        self.aq.resources()
+        self.prov.provide("late", self.double)
+        self.assertIs(self.aq.dispatch_table()["late"], self.double)
+
+        other = Provider(resources={"string": "Another string"})
+        self.aq.acquire_from(other)
+        self.assertEqual(self.aq.dispatch_table()["string"], "Another string")
+
+    def test_request_memoized(self):
+        aq = Acquirer()
+        ListProvider(acquirer=aq)
+        fn = aq.dispatch_table()["list"]
+
+        # The global memo returns copies, the request one the same list
+        self.assertIsNot(fn(3), fn(3))
+        with request_context():
+            self.assertIs(fn(3), fn(3))
+
     def tearDown(self):
         pass
 
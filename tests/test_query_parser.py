@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_query_parser
+----------------------------------
+
+Tests for `query_parser` module.
+"""
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from edn_format import loads
+
+from wikipediabase.query_parser import (UnsupportedSyntax,
+                                        fast_loads,
+                                        parse_query)
+
+QUERIES = [
+    '(get "wikipedia-person" "Bill Clinton" (:code "BIRTH-DATE"))\n',
+    '(get "wikipedia-person" (get "wikipedia-person" "Bill Clinton" '
+    '(:code "SPOUSE")) (:code "BIRTH-DATE"))',
+    '(sort-symbols "Mary Shakespeare" "Batman")',
+    '(a, 1 -2 +3 4.5 nil true false :b.c - <= "" "\xc3\xbc")',
+    u'(get "W\xfcrzburg" x)',
+    '()',
+    'symbol',
+]
+
+UNSUPPORTED = ['(a [1])', '{:a 1}', '#{1}', '"a\\"b"', '(a ; comment\n b)',
+               'foo/bar', '1N', '(a))', '((a)', 'a b', '']
+
+
+class TestQueryParser(unittest.TestCase):
+
+    def test_like_edn(self):
+        for q in QUERIES:
+            parsed = fast_loads(q)
+            self.assertEqual(parsed, loads(q))
+            self.assertEqual(repr(parsed), repr(loads(q)))
+
+    def test_unsupported(self):
+        for q in UNSUPPORTED:
+            self.assertRaises(UnsupportedSyntax, fast_loads, q)
+
+    def test_fallback(self):
+        self.assertEqual(parse_query('(a [1])'), loads('(a [1])'))
+        self.assertIs(parse_query(QUERIES[0]), parse_query(QUERIES[0]))
+
+if __name__ == '__main__':
+    unittest.main()
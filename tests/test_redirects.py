@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_redirects
+----------------------------------
+
+Tests for `redirects` module.
+"""
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+import os
+import tempfile
+
+from wikipediabase import redirects
+from wikipediabase.fetcher import BaseFetcher
+
+
+class RedirectFetcher(BaseFetcher):
+
+    def __init__(self):
+        self.asked = []
+
+    def canonical_title(self, symbol, **kwargs):
+        self.asked.append(symbol)
+        if symbol == "Barack Hussein Obama":
+            return u"Barack Obama"
+
+        raise LookupError("Could not find article '%s'" % symbol)
+
+
+class TestRedirects(unittest.TestCase):
+
+    def setUp(self):
+        self.fetcher = RedirectFetcher()
+
+    def test_normalize_title(self):
+        self.assertEqual(redirects.normalize_title(u" barack_Obama"),
+                         u"Barack Obama")
+
+    def test_canonical_title(self):
+        self.assertEqual(redirects.canonical_title("Barack Hussein Obama",
+                                                   fetcher=self.fetcher),
+                         u"Barack Obama")
+        self.assertRaises(LookupError, redirects.canonical_title,
+                          "No such article", fetcher=self.fetcher)
+
+    def test_persistent(self):
+        redirects.persist_redirects(os.path.join(tempfile.mkdtemp(),
+                                                 "redirects"))
+        try:
+            self.assertEqual(redirects.load_redirects(
+                [(u"Bill_clinton", u"Bill_Clinton")]), 1)
+
+            self.assertEqual(redirects.canonical_title(
+                "bill clinton", fetcher=self.fetcher), u"Bill Clinton")
+            self.assertEqual(redirects.canonical_title(
+                "Barack Hussein Obama", fetcher=self.fetcher), u"Barack Obama")
+            self.assertEqual(redirects.canonical_title(
+                "Barack Hussein Obama", fetcher=self.fetcher), u"Barack Obama")
+            self.assertEqual(self.fetcher.asked, ["Barack Hussein Obama"])
+        finally:
+            redirects.persist_redirects(None)
+
+    def tearDown(self):
+        pass
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_result_cache
+----------------------------------
+
+Tests for `result_cache` module.
+"""
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+import StringIO
+
+from edn_format import loads
+
+from wikipediabase.frontend import Frontend
+from wikipediabase.provider import Provider
+from wikipediabase.result_cache import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResultCache()
+        self.calls = []
+
+        def get(*args):
+            self.calls.append(args)
+            return len(self.calls)
+
+        self.fe = Frontend(providers=[Provider(resources={"get": get})],
+                           result_cache=self.cache)
+
+    def test_key(self):
+        self.assertEqual(self.cache.key(loads('(get "a"  :b 1)')),
+                         self.cache.key(loads('(get "a" :b 1)')))
+        self.assertNotEqual(self.cache.key(loads('(get "a" 1)')),
+                            self.cache.key(loads('(get "a" 1.0)')))
+        self.assertNotEqual(self.cache.key(loads('(get "a" b)')),
+                            self.cache.key(loads('(get "a" "b")')))
+        self.assertIsNone(self.cache.key(loads('(quit)')))
+        self.assertIsNone(self.cache.key(loads('(get (commands))')))
+
+    def test_eval(self):
+        self.assertEqual(self.fe.eval('(get "a" b)'), u'1')
+        self.assertEqual(self.fe.eval('(get  "a" b)'), u'1')
+        self.assertEqual(self.fe.eval('(get "a" c)'), u'2')
+        self.assertEqual(len(self.calls), 2)
+
+    def test_stream(self):
+        for _ in xrange(2):
+            fd = StringIO.StringIO()
+            self.fe.stream('(get "a" b)', fd)
+            self.assertEqual(fd.getvalue(), '1')
+
+        self.assertEqual(len(self.calls), 1)
+
+    def test_error_expiry(self):
+        cache = ResultCache(error_expiry=-1)
+        cache.set(u'a', u'((:error KeyError :message "a"))')
+        cache.set(u'b', u'{"error": {"symbol": "KeyError"}}')
+        cache.set(u'c', u'"fine"')
+        self.assertIsNone(cache.get(u'a'))
+        self.assertIsNone(cache.get(u'b'))
+        self.assertEqual(cache.get(u'c'), u'"fine"')
+
+    def tearDown(self):
+        pass
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,12 +13,48 @@ try:
 except ImportError:
     import unittest
 
-# TODO: add tests
+from wikipediabase import sort_symbols
+
+LENGTHS = {"Batman": 30, "Batman (1989 film)": 20, "batman": 10}
+
+
+def fake_length(symbol):
+    try:
+        return LENGTHS[symbol]
+    except KeyError:
+        raise LookupError("Could not find article '%s'" % symbol)
 
 
 class TestSortSymbols(unittest.TestCase):
-    pass
+
+    def setUp(self):
+        self.article_length = sort_symbols.article_length
+        sort_symbols.article_length = fake_length
+
+    def test_sort_by_length(self):
+        self.assertEqual(sort_symbols.sort_by_length("batman", "Batman",
+                                                     "Batman (1989 film)"),
+                         ["Batman", "Batman (1989 film)", "batman"])
+
+    def test_missing(self):
+        self.assertRaises(LookupError, sort_symbols.sort_by_length,
+                          "Batman", "Robin")
+
+    def tearDown(self):
+        sort_symbols.article_length = self.article_length
 
 
 class TestSortSymbolsNamed(unittest.TestCase):
-    pass
+
+    def setUp(self):
+        self.article_length = sort_symbols.article_length
+        sort_symbols.article_length = fake_length
+
+    def test_sort_named(self):
+        self.assertEqual(sort_symbols.sort_named("batman", "Robin", "Batman",
+                                                 "Batman (1989 film)",
+                                                 "batman"),
+                         ["batman", "Batman", "Batman (1989 film)"])
+
+    def tearDown(self):
+        sort_symbols.article_length = self.article_length
@@ -13,7 +13,36 @@ try:
 except ImportError:
     import unittest
 
+import os
+import tempfile
+
+from wikipediabase import redirects
 from wikipediabase import synonym_inducers as si
+from wikipediabase.adhoc.synonym_dumper import (dump_redirects,
+                                                dump_synonyms,
+                                                reverse_synonyms)
+from wikipediabase.fetcher import BaseFetcher
+from wikipediabase.title_index import TitleIndex, use_title_index
+
+
+class MissingFetcher(BaseFetcher):
+
+    def canonical_title(self, symbol, **kwargs):
+        raise LookupError("Could not find article '%s'" % symbol)
+
+
+class TitleFetcher(BaseFetcher):
+
+    def canonical_title(self, symbol, **kwargs):
+        if symbol == u"Bill Clinton":
+            return symbol
+
+        raise LookupError("Could not find article '%s'" % symbol)
+
+
+REDIRECTS = [(u"Barack_Hussein_Obama", u"Barack_Obama"),
+             (u"Obama (president)", u"Barack_Obama"),
+             (u"Bill clinton", u"Bill_Clinton")]
 
 class TestSynonymInducers(unittest.TestCase):
 
@@ -28,10 +57,76 @@ class TestSynonymInducers(unittest.TestCase):
         fr = si.ForwardRedirectInducer()
         self.assertIn('barack obama', fr.induce("Barack Hussein Obama"))
 
+    def test_forward_redirect_missing(self):
+        fr = si.ForwardRedirectInducer()
+        self.assertRaises(LookupError, fr.title, "No such article",
+                          fetcher=MissingFetcher())
+        self.assertEqual(fr.induce("No such article",
+                                   fetcher=MissingFetcher()), [])
+
+    def test_forward_redirect_title_index(self):
+        fr = si.ForwardRedirectInducer()
+        filename = os.path.join(tempfile.mkdtemp(), "titles")
+        TitleIndex.build([u"Bill Clinton"], filename=filename)
+
+        # Not used unless asked for
+        self.assertRaises(LookupError, fr.title, "The Bill Clinton",
+                          fetcher=TitleFetcher())
+
+        use_title_index(filename, max_distance=1)
+        try:
+            self.assertEqual(fr.title("The Bill Clinton",
+                                      fetcher=TitleFetcher()),
+                             u"Bill Clinton")
+            self.assertEqual(fr.title("bill clintn", fetcher=TitleFetcher()),
+                             u"Bill Clinton")
+            self.assertRaises(LookupError, fr.title, "bill clntn",
+                              fetcher=TitleFetcher())
+        finally:
+            use_title_index(None)
+
     def test_lexical(self):
         fl = si.LexicalInducer()
         self.assertIn('awesome', fl.induce('awesome (singer)'))
 
+    def test_reverse_synonyms(self):
+        synonyms = reverse_synonyms(REDIRECTS)
+        self.assertEqual(synonyms[u"Barack Obama"],
+                         {u"barack obama", u"barack hussein obama",
+                          u"obama president", u"obama"})
+        self.assertEqual(synonyms[u"Bill Clinton"], {u"bill clinton"})
+
+        # Titles that reduce to the same string are kept apart
+        synonyms = reverse_synonyms([(u"The Who (band)", u"The Who"),
+                                     (u"Who (pronoun)", u"Who")])
+        self.assertEqual(sorted(synonyms), [u"The Who", u"Who"])
+        self.assertNotIn(u"who pronoun", synonyms[u"The Who"])
+
+    def test_synonym_index(self):
+        filename = os.path.join(tempfile.mkdtemp(), "synonyms")
+        self.assertEqual(dump_synonyms(REDIRECTS, filename), 2)
+
+        index = si.get_synonym_index(filename)
+        self.assertIn(u"barack hussein obama", index.get("Barack_Obama"))
+        self.assertIs(index.get("Barack Hussein Obama"), None)
+
+        # Rebuilding while the index is open
+        self.assertEqual(dump_synonyms(REDIRECTS[:1], filename), 1)
+
+        # Not used unless asked for
+        self.assertIs(si.get_synonym_index(), None)
+
+    def test_dump_redirects(self):
+        filename = os.path.join(tempfile.mkdtemp(), "redirects")
+        self.assertEqual(dump_redirects(REDIRECTS, filename), 3)
+
+        redirects.persist_redirects(filename)
+        try:
+            self.assertEqual(redirects.canonical_title(
+                "Bill clinton", fetcher=MissingFetcher()), u"Bill Clinton")
+        finally:
+            redirects.persist_redirects(None)
+
     def tearDown(self):
         pass
 
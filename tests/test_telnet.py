@@ -14,7 +14,11 @@ except ImportError:
     import unittest
 
 
+import os
+import socket
 import telnetlib
+import threading
+import time
 
 from wikipediabase import telnet
 
@@ -22,7 +26,7 @@ from wikipediabase import telnet
 # TODO: fix this test, it's hanging because the server is single-threaded
 
 def answer(msg):
-    return "You said '%s'" % msg
+    return u"You said '%s'\n" % msg
 
 
 class TestTelnet(unittest.TestCase):
@@ -40,5 +44,143 @@ class TestTelnet(unittest.TestCase):
         self.srv.shutdown()
         self.srv.server_close()
 
+
+class TestThreadedTelnet(unittest.TestCase):
+
+    def setUp(self):
+        self.srv = telnet.ThreadedTelnetServer(('127.0.0.1', 0), answer,
+                                               workers=2)
+        self.port = self.srv.server_address[1]
+        self.thread = threading.Thread(target=self.srv.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def test_pipelined(self):
+        cli = telnetlib.Telnet("127.0.0.1", self.port, timeout=5)
+        cli.write("first\nsecond\n")
+        self.assertEqual(cli.read_until("\n", 5), "You said 'first'\n")
+        self.assertEqual(cli.read_until("\n", 5), "You said 'second'\n")
+        cli.write("third\n")
+        self.assertEqual(cli.read_until("\n", 5), "You said 'third'\n")
+        cli.close()
+
+    def test_concurrent(self):
+        # An idle connection does not block other clients
+        idle = socket.create_connection(("127.0.0.1", self.port))
+        cli = telnetlib.Telnet("127.0.0.1", self.port, timeout=5)
+        cli.write("hello\n")
+        self.assertEqual(cli.read_until("\n", 5), "You said 'hello'\n")
+        cli.close()
+        idle.close()
+
+    def tearDown(self):
+        self.srv.shutdown()
+        self.srv.server_close()
+
+
+class TestStreamingTelnet(unittest.TestCase):
+
+    def setUp(self):
+        def stream(msg, fd):
+            for c in answer(msg):
+                fd.write(c.encode('utf-8'))
+
+        self.srv = telnet.ThreadedTelnetServer(('127.0.0.1', 0), None,
+                                               workers=2, stream=stream)
+        self.port = self.srv.server_address[1]
+        self.thread = threading.Thread(target=self.srv.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def test_stream(self):
+        cli = telnetlib.Telnet("127.0.0.1", self.port, timeout=5)
+        cli.write("first\nsecond\n")
+        self.assertEqual(cli.read_until("\n", 5), "You said 'first'\n")
+        self.assertEqual(cli.read_until("\n", 5), "You said 'second'\n")
+        cli.close()
+
+    def tearDown(self):
+        self.srv.shutdown()
+        self.srv.server_close()
+
+
+class TestAsyncTelnet(unittest.TestCase):
+
+    def setUp(self):
+        def slow_answer(msg):
+            if msg == "slow":
+                time.sleep(2)
+            return answer(msg)
+
+        self.srv = telnet.AsyncTelnetServer(
+            ('127.0.0.1', 0), slow_answer, workers=2, deadline=0.5,
+            on_timeout=lambda msg: u"Too slow '%s'\n" % msg)
+        self.port = self.srv.server_address[1]
+        self.thread = threading.Thread(target=self.srv.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def test_pipelined(self):
+        cli = telnetlib.Telnet("127.0.0.1", self.port, timeout=5)
+        cli.write("first\nsecond\n")
+        self.assertEqual(cli.read_until("\n", 5), "You said 'first'\n")
+        self.assertEqual(cli.read_until("\n", 5), "You said 'second'\n")
+        cli.close()
+
+    def test_deadline(self):
+        cli = telnetlib.Telnet("127.0.0.1", self.port, timeout=5)
+        cli.write("slow\nfast\n")
+        self.assertEqual(cli.read_until("\n", 5), "Too slow 'slow'\n")
+        self.assertEqual(cli.read_until("\n", 5), "You said 'fast'\n")
+        cli.close()
+
+    def tearDown(self):
+        self.srv.shutdown()
+        self.thread.join()
+        self.srv.server_close()
+
+
+class TestPreforkTelnet(unittest.TestCase):
+
+    def setUp(self):
+        def pid_answer(msg):
+            if msg.strip() == "quit":
+                self.srv.quit(3)
+
+            return u"%d\n" % os.getpid()
+
+        self.srv = telnet.PreforkTelnetServer(('127.0.0.1', 0), pid_answer,
+                                              processes=1, max_requests=1,
+                                              persistent=False)
+        self.port = self.srv.server_address[1]
+        self.thread = threading.Thread(target=self.srv.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def ask(self):
+        cli = telnetlib.Telnet("127.0.0.1", self.port, timeout=5)
+        cli.write("pid\n")
+        ret = int(cli.read_until("\n", 5))
+        cli.close()
+        return ret
+
+    def test_recycle(self):
+        first = self.ask()
+        self.assertNotEqual(first, os.getpid())
+        self.assertNotEqual(first, self.ask())
+
+    def test_quit(self):
+        cli = telnetlib.Telnet("127.0.0.1", self.port, timeout=5)
+        cli.write("quit\n")
+        self.thread.join(5)
+        cli.close()
+        self.assertFalse(self.thread.is_alive())
+        self.assertEqual(self.srv.exit_status, 3)
+
+    def tearDown(self):
+        self.srv.shutdown()
+        self.thread.join()
+        self.srv.server_close()
+
 if __name__ == '__main__':
     unittest.main()
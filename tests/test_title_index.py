@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_title_index
+----------------------------------
+
+Tests for `title_index` module.
+"""
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+import os
+import tempfile
+
+from wikipediabase.title_index import TitleIndex, get_title_index
+
+TITLES = [u"Bill Clinton", u"Batman", u"Batman (1989 film)",
+          u"Pokémon"]
+REDIRECTS = [(u"Barack_Hussein_Obama", u"Barack_Obama"),
+             (u"Bat-Man", u"Batman")]
+
+
+class TestTitleIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = os.path.join(tempfile.mkdtemp(), "titles")
+        TitleIndex.build(TITLES, REDIRECTS, self.filename)
+        self.index = TitleIndex(self.filename)
+
+    def test_exact(self):
+        self.assertEqual(self.index.exact("bill clinton"), [u"Bill Clinton"])
+        self.assertEqual(self.index.exact("The Bat Man"), [u"Batman"])
+        self.assertEqual(self.index.exact("Barack Hussein Obama"),
+                         [u"Barack Obama"])
+        self.assertEqual(self.index.exact(u"POKÉMON"), [u"Pokémon"])
+        self.assertEqual(self.index.exact("Batman (film)"), [])
+        self.assertEqual(self.index.exact("zorro"), [])
+
+    def test_prefix(self):
+        self.assertEqual(self.index.prefix("bat"),
+                         [u"Batman", u"Batman (1989 film)"])
+        self.assertEqual(self.index.prefix("bat", limit=1), [u"Batman"])
+        self.assertEqual(self.index.prefix("zorro"), [])
+
+    def test_approximate(self):
+        self.assertEqual(self.index.approximate("bill clintn"),
+                         [u"Bill Clinton"])
+        # Also the lexical synonym of the film
+        self.assertEqual(self.index.approximate("batmn", max_distance=1),
+                         [u"Batman", u"Batman (1989 film)"])
+        self.assertEqual(self.index.approximate(u"pokemon", max_distance=1),
+                         [u"Pokémon"])
+        self.assertEqual(self.index.approximate("bill clntn",
+                                                max_distance=1), [])
+        self.assertEqual(self.index.lookup("bill clintn"), [])
+        self.assertEqual(self.index.lookup("bill clintn", max_distance=1),
+                         [u"Bill Clinton"])
+
+    def test_empty(self):
+        TitleIndex.build(filename=self.filename)
+        index = TitleIndex(self.filename)
+        self.assertEqual(index.exact("batman"), [])
+        self.assertEqual(index.approximate("batman"), [])
+
+    def test_get_title_index(self):
+        index = get_title_index(self.filename)
+        self.assertEqual(index.exact("bat man"), [u"Batman"])
+        self.assertIs(get_title_index(self.filename), index)
+        self.assertIs(get_title_index(self.filename + "-missing"), None)
+
+        # Not used unless asked for
+        self.assertIs(get_title_index(), None)
+
+        # A rebuilt index is opened again
+        TitleIndex.build([u"Batman"], filename=self.filename)
+        self.assertEqual(get_title_index(self.filename).exact("bill clinton"),
+                         [])
+
+    def tearDown(self):
+        pass
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,6 +29,48 @@ class TestUtil(unittest.TestCase):
         self.assertEqual(util.totext(util.fromstring("hello<br/>")), "hello")
         self.assertEqual(util.totext(util.fromstring("<br/>", True)), "\n")
 
+    def test_data_file(self):
+        data_dir = util.DATA_DIR
+        util.DATA_DIR = "/var/lib/wikipediabase"
+        try:
+            self.assertEqual(util.data_file("titles"),
+                             "/var/lib/wikipediabase/titles")
+            self.assertEqual(util.data_file("/srv/titles"), "/srv/titles")
+        finally:
+            util.DATA_DIR = data_dir
+
+    def test_lru_cache(self):
+        cache = util.LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(len(cache), 2)
+
+        expired = util.LRUCache(ttl=-1)
+        expired.set("a", 1)
+        self.assertIsNone(expired.get("a"))
+
+    def test_request_memoized(self):
+        calls = []
+
+        @util.request_memoized
+        def double(x):
+            calls.append(x)
+            return 2 * x
+
+        with util.request_context():
+            self.assertEqual(double(1), 2)
+            with util.request_context():
+                self.assertEqual(double(1), 2)
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(double(1), 2)
+        self.assertEqual(double(1), 2)
+        self.assertEqual(calls, [1, 1, 1])
+
     def test_infoboxes(self):
         c = InfoboxScraper(self.symbol)
         self.assertIs(list, type(util.get_infoboxes(self.symbol)))
@@ -0,0 +1,49 @@
+"""
+Pre-populate the cached infobox records of a bunch of articles (eg the
+most queried ones) so that the server never has to scrape them. Give
+it a file with one symbol per line or '-' for stdin:
+
+    python -m wikipediabase.adhoc.infobox_records symbols.txt
+"""
+
+import sys
+
+from wikipediabase.fetcher import WIKIBASE_FETCHER
+from wikipediabase.infobox import InfoboxScraper
+from wikipediabase.util import time_interval
+
+
+def cache_infobox_records(symbols, fetcher=None):
+    """
+    Generate (symbol, number of infoboxes) for each symbol whose
+    records are now cached.
+    """
+
+    fetcher = fetcher or WIKIBASE_FETCHER
+
+    for symbol in symbols:
+        try:
+            infoboxes = InfoboxScraper(symbol, fetcher=fetcher).infoboxes()
+        except LookupError:
+            sys.stderr.write("Could not find '%s'\n" % symbol)
+            continue
+
+        yield symbol, len(infoboxes)
+
+
+def _main():
+    try:
+        fi = open(sys.argv[1]) if sys.argv[1] != '-' else sys.stdin
+    except IndexError:
+        sys.stderr.write(__doc__.strip() + "\n")
+        return
+
+    symbols = (l.decode('utf-8').strip() for l in fi if l.strip())
+    time_interval("infobox_records")
+    for i, (symbol, n) in enumerate(cache_infobox_records(symbols)):
+        sys.stderr.write("[ %s ] %d. %s: %d infoboxes\n" %
+                         (time_interval("infobox_records"), i, symbol, n))
+
+
+if __name__ == "__main__":
+    _main()
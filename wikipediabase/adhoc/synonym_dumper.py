@@ -1,4 +1,150 @@
 """
-Dump an sql of all synonyms based on a wikimirror instance. These
-mean only backwards synonyms.
+Build the synonym index (see synonym_inducers.SynonymIndex) from the
+redirects of a wikimirror instance or of a file, and the title index
+(see title_index.TitleIndex) from its article titles and redirects,
+that servers started with --title-index match symbols against. The
+file ('-' for stdin) has one article title or one
+'title<TAB>target' redirect per line. Redirects mean only backwards
+synonyms, the forward ones are the lexical synonyms of the target
+itself. The redirects are also kept in the redirect map (see
+redirects.persist_redirects) that servers started with --redirects
+resolve titles through.
+
+    python -m wikipediabase.adhoc.synonym_dumper {db, <file>}
+        [index [titles [redirects]]]
 """
+
+import os
+import sys
+
+from collections import defaultdict
+
+from wikipediabase.redirects import (REDIRECTS_FILE,
+                                     load_redirects,
+                                     normalize_title,
+                                     persist_redirects)
+from wikipediabase.synonym_inducers import (SYNONYMS_FILE,
+                                            SynonymIndex,
+                                            lexical_synonyms)
+from wikipediabase.title_index import TITLES_FILE, TitleIndex
+from wikipediabase.util import data_file, time_interval
+
+
+def reverse_synonyms(redirects):
+    """
+    Map each canonical title in (title, target) redirects to the
+    string_reduced synonyms of it and all the titles redirecting to
+    it.
+    """
+
+    synonyms = defaultdict(set)
+    for title, target in redirects:
+        target = normalize_title(target)
+        if target not in synonyms:
+            synonyms[target].update(lexical_synonyms(target))
+
+        synonyms[target].update(lexical_synonyms(normalize_title(title)))
+
+    return synonyms
+
+
+def dump_synonyms(redirects, filename=SYNONYMS_FILE):
+    """
+    Build the synonym index at filename. Return the number of
+    canonical titles in it. The index is built next to filename and
+    then moved over it, so servers that have the old one open keep
+    reading that.
+    """
+
+    filename = data_file(filename)
+    building = filename + ".building"
+    if os.path.exists(building):
+        os.remove(building)
+
+    index = SynonymIndex(building)
+    synonyms = reverse_synonyms(redirects)
+    for title, syns in synonyms.iteritems():
+        index.set(title, syns)
+
+    # Close the file before moving it
+    del index
+    os.rename(building, filename)
+    return len(synonyms)
+
+
+def dump_redirects(redirects, filename=REDIRECTS_FILE):
+    """
+    Add the redirects to the redirect map at filename. Return the
+    number of redirects added.
+    """
+
+    persist_redirects(filename)
+    try:
+        return load_redirects(redirects)
+    finally:
+        # Close the file so servers can open it
+        persist_redirects(None)
+
+
+def file_titles(fi):
+    """
+    The article titles and the (title, target) redirects of the lines
+    of fi.
+    """
+
+    titles, redirects = [], []
+    for l in fi:
+        title, _, target = l.decode('utf-8').rstrip('\n').partition('\t')
+        if title and target:
+            redirects.append((title, target))
+        elif title:
+            titles.append(title)
+
+    return titles, redirects
+
+
+def db_titles():
+    from wikipediabase.dbfetcher import DBUtil
+
+    db = DBUtil()
+    titles = [t.decode('utf-8') for t, in db.titles()]
+    redirects = [(title.decode('utf-8'), target.decode('utf-8'))
+                 for title, target in db.redirects()]
+    return titles, redirects
+
+
+def _main():
+    try:
+        source = sys.argv[1]
+    except IndexError:
+        sys.stderr.write(__doc__.strip() + "\n")
+        return
+
+    filename = os.path.abspath(sys.argv[2]) if len(sys.argv) > 2 \
+        else data_file(SYNONYMS_FILE)
+    titles_filename = os.path.abspath(sys.argv[3]) if len(sys.argv) > 3 \
+        else data_file(TITLES_FILE)
+    redirects_filename = os.path.abspath(sys.argv[4]) if len(sys.argv) > 4 \
+        else data_file(REDIRECTS_FILE)
+    time_interval("synonym_dumper")
+    if source == 'db':
+        titles, redirects = db_titles()
+    else:
+        titles, redirects = file_titles(open(source) if source != '-'
+                                        else sys.stdin)
+
+    n = dump_synonyms(redirects, filename)
+    sys.stderr.write("[ %s ] Wrote the synonyms of %d titles to %s\n" %
+                     (time_interval("synonym_dumper"), n, filename))
+
+    n = TitleIndex.build(titles, redirects, titles_filename)
+    sys.stderr.write("[ %s ] Wrote %d titles to %s\n" %
+                     (time_interval("synonym_dumper"), n, titles_filename))
+
+    n = dump_redirects(redirects, redirects_filename)
+    sys.stderr.write("[ %s ] Wrote %d redirects to %s\n" %
+                     (time_interval("synonym_dumper"), n, redirects_filename))
+
+
+if __name__ == "__main__":
+    _main()
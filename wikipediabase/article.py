@@ -1,5 +1,8 @@
+import threading
+
 from itertools import chain
 
+from wikipediabase.article_stats import occurrences, proper_name, text_stats
 from wikipediabase.classifiers import WIKIBASE_CLASSIFIERS
 from wikipediabase.fetcher import WIKIBASE_FETCHER
 from wikipediabase.log import Logging
@@ -27,6 +30,9 @@ class Article(Logging):
         self._title = title
         self.fetcher = fetcher
         self._infoboxes = []
+        self._parsed = None
+        self._stats = None
+        self._stats_lock = threading.Lock()
         self.title_inducer = ForwardRedirectInducer()
 
     @memoized
@@ -39,10 +45,10 @@ class Article(Logging):
         return self.title_inducer.title(self._title, fetcher=self.fetcher)
 
     def _soup(self):
-        if not hasattr(self, '__soup'):
-            self.__soup = fromstring(self.html_source())
+        if self._parsed is None:
+            self._parsed = fromstring(self.html_source())
 
-        return self.__soup
+        return self._parsed
 
     def categories(self):
         return markup_categories(self.markup_source())
@@ -116,6 +122,47 @@ class Article(Logging):
                 for h in s.findall(xpath)
                 if "".join(h.itertext())]
 
+    def stats(self):
+        """
+        Statistics of the text of the article, see
+        wikipediabase.article_stats. Fetchers that cache keep them per
+        revision of the article.
+        """
+
+        with self._stats_lock:
+            if self._stats is None:
+                stats = self.fetcher.get_record(self._title, 'stats')
+                if stats is None:
+                    stats = text_stats(self.html_source(), self.paragraphs(),
+                                       proper_name(self._title))
+                    self.fetcher.set_record(self._title, 'stats', stats)
+
+                self._stats = stats
+
+            return self._stats
+
+    def occurrences(self, name):
+        """
+        How many times name appears in the html source, see
+        article_stats.occurrences. Names other than the article's own
+        are added to the statistics the first time they are asked for.
+        """
+
+        stats = self.stats()
+        if name in stats['occurrences']:
+            return stats['occurrences'][name]
+
+        counts = occurrences(self.html_source(), name)
+        with self._stats_lock:
+            # Replace rather than change the statistics others may be
+            # reading
+            names = dict(self._stats['occurrences'])
+            names[name] = counts
+            self._stats = dict(self._stats, occurrences=names)
+            self.fetcher.set_record(self._title, 'stats', self._stats)
+
+        return counts
+
     def first_paragraph(self, keep_html=False):
         for p in self.paragraphs(keep_html=keep_html):
             if p.strip():
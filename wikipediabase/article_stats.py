@@ -0,0 +1,89 @@
+"""
+Statistics of the text of an article that the calculated attributes
+(word-count, number, proper, gender and the length sort-symbols uses)
+are based on. They are all computed in one go from the parsed article
+(see Article.stats) and fetchers that cache keep them per revision, so
+those attributes become lookups.
+"""
+
+from wikipediabase.patterns import (PRONOUN_REGEX,
+                                    SPACED_PARENS_REGEX,
+                                    WORD_REGEX)
+
+PRONOUN_GENDERS = dict(
+    [(w, 'masculine') for w in ["he", "him", "his"]] +
+    [(w, 'feminine') for w in ["she", "her", "hers"]] +
+    [(w, 'neuter') for w in ["it", "its", "they", "their", "theirs"]])
+
+SINGULAR_VERBS = [' is ', ' was ', ' has ']
+PLURAL_VERBS = [' are ', ' were ', ' have ']
+
+# The pronoun counts only decide the gender of an article, so stop
+# counting once one gender is this far ahead of the others.
+PRONOUN_MARGIN = 50
+
+
+def count_pronouns(paragraphs, margin=None):
+    """
+    Count the masculine, feminine and neuter pronouns in paragraphs in
+    one pass. With a margin stop counting as soon as one gender is
+    ahead of both others by that much.
+    """
+
+    counts = dict(masculine=0, feminine=0, neuter=0)
+    for p in paragraphs:
+        for m in PRONOUN_REGEX.finditer(p):
+            gender = PRONOUN_GENDERS[m.group(1).lower()]
+            counts[gender] += 1
+
+            if margin is not None and counts[gender] - max(
+                    c for g, c in counts.items() if g != gender) >= margin:
+                return counts
+
+    return counts
+
+
+def proper_name(symbol):
+    """
+    The symbol as it would appear in text, eg 'Batman' for
+    'Batman_(1989_film)'.
+    """
+
+    return SPACED_PARENS_REGEX.sub("", symbol.replace("_", " "))
+
+
+def occurrences(text, name):
+    """
+    How many times name appears in text in lower case, in lower case
+    after a full stop and as it is.
+    """
+
+    return [text.count(name.lower()), text.count(". " + name.lower()),
+            text.count(name)]
+
+
+def text_stats(html, paragraphs, name, pronoun_margin=PRONOUN_MARGIN):
+    """
+    The statistics of an article given its html source, its
+    paragraphs and its name:
+
+    - words: the number of words in the html source
+    - paragraphs: the length of each paragraph
+    - pronouns: the pronoun counts of each gender in the paragraphs,
+      counted until one gender is ahead by pronoun_margin
+    - verbs: the singular and plural verb counts of the first
+      paragraph, which refers to the article itself more often than
+      the rest
+    - occurrences: the occurrences of the name in the html source by
+      name, more names may be added later
+    """
+
+    first = next((p for p in paragraphs if p.strip()), u"")
+    return {
+        'words': len(WORD_REGEX.findall(html.lower())),
+        'paragraphs': [len(p) for p in paragraphs],
+        'pronouns': count_pronouns(paragraphs, pronoun_margin),
+        'verbs': {'singular': sum(map(first.count, SINGULAR_VERBS)),
+                  'plural': sum(map(first.count, PLURAL_VERBS))},
+        'occurrences': {name: occurrences(html, name)},
+    }
@@ -4,29 +4,151 @@ Open telnet server for start to communicate at.
 
 Usage:
   wikipediabase [options]
+  wikipediabase build-type-tree [<file>] [options]
+  wikipediabase build-metainfobox-catalog [<file>] [options]
 
   wikipediabase -h | --help
 
 Options:
-  -p --port             Port (default: 1984)
+  -p --port=<port>      Port [default: 8023]
+  -w --workers=<n>      Serve up to n clients concurrently, each on a
+                        thread of its own.
+  --single-query        With --workers, close connections after one
+                        query instead of answering queries until the
+                        client hangs up.
+  --async               Accept connections on an event loop and answer
+                        on a pool of --workers threads (default: 8).
+  --deadline=<seconds>  With --async, answer queries that take longer
+                        with a timeout error [default: 30].
+  --prefork=<n>         Answer on n worker processes forked after the
+                        caches are warmed up.
+  --max-requests=<n>    With --prefork, replace a worker after it has
+                        served n connections [default: 1000].
+  --http                Answer queries over HTTP in json instead, on
+                        --workers threads (default: 8).
+  --shared-result-cache  Keep the answers to queries in redis too, so
+                        that all the servers share them.
+  --data-dir=<dir>      Keep snapshots, indices and other data files in
+                        dir (default: $WIKIPEDIABASE_DATA_DIR or the
+                        temporary directory).
+  --date-cache          Keep the parsed dates in a file in the data
+                        directory too, so they survive restarts. Only
+                        one process may use it, so not with --prefork.
+  --redirects           Resolve titles through the redirect map that
+                        adhoc/synonym_dumper keeps in the data
+                        directory. Only one process may use it, so not
+                        with --prefork.
+  --synonym-index       Look synonyms up in the index that
+                        adhoc/synonym_dumper builds in the data
+                        directory. Each process opens it read only.
+  --title-index=<edits>  Match symbols that are not titles against the
+                        title index that adhoc/synonym_dumper builds in
+                        the data directory, allowing up to that many
+                        typos.
 
   -h --help             Show this screen.
+
+Commands:
+  build-type-tree       Fetch the infobox type tree and save a snapshot
+                        of it that the servers load at startup.
+  build-metainfobox-catalog
+                        Precompute the rendered attributes of all the
+                        infobox templates in the type tree.
 """
 
 from docopt import docopt
 import logging
+import os
+import sys
 
 import wikipediabase
-from wikipediabase.frontend import TelnetFrontend
+from wikipediabase.dates import persist_dates
+from wikipediabase.frontend import (AsyncTelnetFrontend,
+                                    HttpFrontend,
+                                    PreforkTelnetFrontend,
+                                    TelnetFrontend)
+from wikipediabase.infobox_tree import (IBX_TREE_FILE,
+                                        refresh_ibx_type_tree)
+from wikipediabase.metainfobox import (METAINFOBOX_CATALOG_FILE,
+                                       MetaInfoboxCatalog)
+from wikipediabase.redirects import persist_redirects
+from wikipediabase.result_cache import ResultCache
+from wikipediabase.synonym_inducers import use_synonym_index
+from wikipediabase.title_index import use_title_index
+from wikipediabase import util
 
 log = logging.getLogger(__name__)
 
+
+def build_type_tree(filename=None):
+    filename = util.data_file(filename or IBX_TREE_FILE)
+    tree = refresh_ibx_type_tree(filename=filename, background=False)
+    log.info("Saved %d infobox types to '%s'", len(tree), filename)
+
+
+def build_metainfobox_catalog(filename=None):
+    catalog = MetaInfoboxCatalog(filename or METAINFOBOX_CATALOG_FILE)
+    templates = catalog.build()
+    log.info("Saved the attributes of %d templates to '%s'",
+             len(templates), catalog.filename)
+
+
 def main():
     arguments = docopt(__doc__, version=wikipediabase.__version__)
     debug = arguments['--debug'] if '--debug' in arguments else None
     logging.basicConfig(level=logging.DEBUG if debug else logging.INFO)
     log.debug('arguments: %s', arguments)
 
-    fe = TelnetFrontend()
+    if arguments['--data-dir']:
+        util.DATA_DIR = arguments['--data-dir']
+
+    # Files given on the command line are relative to where we run
+    filename = arguments['<file>'] and os.path.abspath(arguments['<file>'])
+
+    if arguments['build-type-tree']:
+        build_type_tree(filename)
+        return
+
+    if arguments['build-metainfobox-catalog']:
+        build_metainfobox_catalog(filename)
+        return
+
+    if arguments['--date-cache']:
+        if arguments['--prefork']:
+            sys.exit("--date-cache does not work with --prefork")
+
+        persist_dates()
+
+    if arguments['--redirects']:
+        if arguments['--prefork']:
+            sys.exit("--redirects does not work with --prefork")
+
+        persist_redirects()
+
+    if arguments['--synonym-index']:
+        use_synonym_index()
+
+    if arguments['--title-index']:
+        use_title_index(max_distance=int(arguments['--title-index']))
+
+    workers = arguments['--workers']
+    kw = dict(port=int(arguments['--port']),
+              workers=int(workers) if workers else None,
+              persistent=not arguments['--single-query'],
+              result_cache=ResultCache(
+                  use_redis=arguments['--shared-result-cache']))
+
+    if arguments['--http']:
+        fe = HttpFrontend(**kw)
+    elif arguments['--prefork']:
+        fe = PreforkTelnetFrontend(
+            processes=int(arguments['--prefork']),
+            max_requests=int(arguments['--max-requests']),
+            **kw)
+    elif arguments['--async']:
+        fe = AsyncTelnetFrontend(deadline=float(arguments['--deadline']),
+                                 **kw)
+    else:
+        fe = TelnetFrontend(**kw)
 
     fe.run()
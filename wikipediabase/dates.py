@@ -0,0 +1,144 @@
+"""
+Date extraction with overlay_parse, which is the slowest part of
+answering most queries about people. The same texts (infobox values,
+first paragraphs) are parsed again and again so the results are kept
+in a bounded cache, and in a persistent dict too for servers started
+with --date-cache (see persist_dates). Texts without digits or month
+names are not parsed at all.
+
+Most infobox dates are templates like {{birth date|1961|8|4}} and
+template_date reads those without overlay_parse.
+"""
+
+import json
+import threading
+
+import overlay_parse
+
+from wikipediabase.patterns import DATE_HINT_REGEX, DATE_TEMPLATE_REGEX
+from wikipediabase.util import LRUCache, data_file
+
+DATES_FILE = "wikipediabase-dates"
+
+_CACHE = LRUCache(maxsize=10000)
+_PERSISTENT = None
+_PERSISTENT_LOCK = threading.Lock()
+
+
+def persist_dates(filename=DATES_FILE):
+    """
+    Also keep the parsed dates in a persistent dict at filename, or
+    stop doing that if filename is None. Only one process may use the
+    file at a time.
+    """
+    global _PERSISTENT
+    from wikipediabase.persistentkv import PersistentDict
+
+    with _PERSISTENT_LOCK:
+        _PERSISTENT = PersistentDict(data_file(filename)) if filename else None
+
+
+def is_date_attr(attr):
+    """
+    Whether the infobox attribute attr holds a date.
+    """
+
+    return bool(attr) and (attr.lower() == 'date' or
+                           attr.lower().endswith("-date"))
+
+
+def template_date(markup):
+    """
+    The (d, m, y) of the first birth date, death date (and age), start
+    date or end date template in markup, or None. Named parameters
+    (eg df=y) are skipped and a missing month or day is 0.
+    """
+
+    m = DATE_TEMPLATE_REGEX.search(markup)
+    if m is None:
+        return None
+
+    nums = []
+    for p in m.group('params').split('|'):
+        p = p.strip()
+        if '=' in p:
+            continue
+
+        if not p.isdigit():
+            # Eg a month name, leave it to overlay_parse
+            return None
+
+        nums.append(int(p))
+        if len(nums) == 3:
+            break
+
+    if not nums:
+        return None
+
+    y, mo, d = (nums + [0, 0])[:3]
+    if mo > 12 or d > 31:
+        return None
+
+    return (d, mo, y)
+
+
+def _tuples(obj):
+    if isinstance(obj, list):
+        return tuple(_tuples(i) for i in obj)
+
+    return obj
+
+
+def _cached(name, fn, txt, *args):
+    if not DATE_HINT_REGEX.search(txt):
+        return []
+
+    key = (name, txt) + tuple(tuple(sorted(a)) for a in args)
+    ret = _CACHE.get(key)
+    if ret is not None:
+        return list(ret)
+
+    pkey = json.dumps(key)
+    with _PERSISTENT_LOCK:
+        try:
+            if _PERSISTENT is not None:
+                ret = [_tuples(d) for d in json.loads(_PERSISTENT[pkey])]
+        except KeyError:
+            pass
+
+    if ret is None:
+        ret = list(fn(txt, *args))
+        with _PERSISTENT_LOCK:
+            if _PERSISTENT is not None:
+                try:
+                    _PERSISTENT[pkey] = json.dumps(ret)
+                except TypeError:
+                    pass
+
+    _CACHE.set(key, ret)
+    return list(ret)
+
+
+def just_props(txt, props, exclude):
+    """
+    Cached overlay_parse.dates.just_props.
+    """
+
+    return _cached('just_props', overlay_parse.dates.just_props,
+                   txt, props, exclude)
+
+
+def just_ranges(txt):
+    """
+    Cached overlay_parse.dates.just_ranges.
+    """
+
+    return _cached('just_ranges', overlay_parse.dates.just_ranges, txt)
+
+
+def just_dates(txt):
+    """
+    Cached overlay_parse.dates.just_dates.
+    """
+
+    return _cached('just_dates', overlay_parse.dates.just_dates, txt)
@@ -111,6 +111,28 @@ class DBUtil(object):
         self.cmd = "select page_namespace from page where page_id = '%s'" % id
         return int(self._query_single())
 
+    def titles(self, ns=0):
+        """
+        Get an iterator over tuples (page_title,) of the articles of
+        namespace ns that are not redirects.
+        """
+
+        self.cmd = "select page_title from page " \
+                   "where page_namespace = %d and page_is_redirect = 0;" % ns
+        return self._query_raw_iter()
+
+    def redirects(self, ns=0):
+        """
+        Get an iterator over tuples (page_title, target_title) of the
+        redirects between articles of namespace ns.
+        """
+
+        self.cmd = "select page_title, rd_title from redirect " \
+                   "join page on page_id = rd_from " \
+                   "where page_namespace = %d and rd_namespace = %d;" \
+                   % (ns, ns)
+        return self._query_raw_iter()
+
     def all_articles(self, limit=None, ns=0):
         """
         Get an iterator over of tuples (page_id, page_text)
@@ -1,22 +1,29 @@
 # -*- coding: utf-8 -*-
 
-import re
+import json
 import redis
 import requests
 
 import logging
 from wikipediabase.log import Logging
+from wikipediabase.patterns import REDIRECT_REGEX, REVISION_REGEX
 from wikipediabase.util import Expiry
 
 logging.getLogger("requests").setLevel(logging.WARNING)
 logging.getLogger("urllib3").setLevel(logging.WARNING)
 
 
-REDIRECT_REGEX = r"#REDIRECT\s*\[\[(.*)\]\]"
 USER_AGENT = "WikipediaBase/1.0 " \
              "(http://start.csail.mit.edu; start-admins@csail.mit.edu)"
 
 
+class MissingArticle(LookupError):
+
+    """
+    There is no such article, as opposed to failing to ask.
+    """
+
+
 class BaseFetcher(Logging):
 
     """
@@ -33,13 +40,42 @@ class BaseFetcher(Logging):
     def markup_source(self, symbol, **kwargs):
         return symbol
 
+    def canonical_title(self, symbol, **kwargs):
+        """
+        The title of the article after following redirects.
+        """
+
+        return symbol
+
+    def revision(self, symbol, **kwargs):
+        """
+        The revision id of the article. Only fetchers that cache know
+        about revisions.
+        """
+
+        return None
+
+    def get_record(self, symbol, domain):
+        """
+        A record (anything json serializable) computed from the
+        current revision of the article or None. The base fetcher
+        keeps no records.
+        """
+
+        return None
+
+    def set_record(self, symbol, domain, record, **kwargs):
+        pass
+
 
 class Fetcher(BaseFetcher):
 
     priority = 1
 
-    def __init__(self, url='https://en.wikipedia.org/w/index.php'):
+    def __init__(self, url='https://en.wikipedia.org/w/index.php',
+                 api_url='https://en.wikipedia.org/w/api.php'):
         self.url = url.strip('/')
+        self.api_url = api_url.strip('/')
 
     def urlopen(self, url, params):
         headers = {'User-Agent': USER_AGENT}
@@ -70,7 +106,7 @@ class Fetcher(BaseFetcher):
         page = self.urlopen(self.url, params)
 
         # handle redirecions silently
-        redirect_match = re.search(REDIRECT_REGEX, page)
+        redirect_match = REDIRECT_REGEX.search(page)
         if redirect_match:
             redirect = redirect_match.group(1)
             self.redirect = redirect
@@ -80,13 +116,34 @@ class Fetcher(BaseFetcher):
 
         return page
 
+    def canonical_title(self, symbol, **kwargs):
+        """
+        Ask the API where the symbol redirects to. This is much
+        cheaper than fetching the article.
+        """
+
+        params = {'action': 'query', 'titles': symbol, 'redirects': '',
+                  'format': 'json'}
+        query = json.loads(self.urlopen(self.api_url, params))['query']
+
+        for page in query.get('pages', {}).values():
+            if 'missing' in page or 'invalid' in page:
+                raise MissingArticle("Could not find article '%s'" % symbol)
+
+            self.log().debug("Canonical title of '%s' is '%s'",
+                             symbol, page['title'])
+            return page['title']
+
+        raise MissingArticle("Could not find article '%s'" % symbol)
+
 
 class CachingFetcher(Fetcher):
 
-    def __init__(self, url='https://en.wikipedia.org/w/index.php'):
+    def __init__(self, url='https://en.wikipedia.org/w/index.php',
+                 api_url='https://en.wikipedia.org/w/api.php'):
         self.redis = redis.StrictRedis(host='localhost', port=6379, db=0,
                                        decode_responses=True)
-        super(CachingFetcher, self).__init__(url)
+        super(CachingFetcher, self).__init__(url, api_url)
 
     def _caching_fetch(self, symbol, content_type, prefix, fetch,
                        expiry=Expiry.DEFAULT):
@@ -117,6 +174,79 @@ class CachingFetcher(Fetcher):
         assert(isinstance(source, unicode))  # TODO : remove for production
         return source
 
+    def canonical_title(self, symbol, expiry=Expiry.LONG,
+                        missing_expiry=Expiry.SHORT):
+        """
+        Missing articles are remembered for missing_expiry as an empty
+        title, so asking for them again does not reach the API.
+        """
+
+        dkey = u'title:' + symbol
+        title = self.redis.get(dkey)
+        if title == u'':
+            raise MissingArticle("Could not find article '%s'" % symbol)
+
+        if title is None:
+            try:
+                title = super(CachingFetcher, self).canonical_title(symbol)
+            except MissingArticle:
+                self.redis.setex(dkey, missing_expiry, u'')
+                raise
+
+            self.redis.set(dkey, title)
+            if expiry is not None:
+                self.redis.expire(dkey, expiry)
+
+        return title
+
+    def revision(self, symbol, expiry=Expiry.DEFAULT):
+        """
+        The revision is kept next to the html it was read from, so
+        that the html is only scanned once. Both go away together.
+        """
+
+        dkey = u'article:' + symbol
+        revision = self.redis.hget(dkey, 'revision')
+        if revision is None:
+            match = REVISION_REGEX.search(self.html_source(symbol,
+                                                           expiry=expiry))
+            if match is None:
+                return None
+
+            revision = match.group(1)
+            self.redis.hset(dkey, 'revision', revision)
+
+        return int(revision)
+
+    def _record_key(self, symbol, domain):
+        revision = self.revision(symbol)
+        if revision is not None:
+            return u"%s:%d" % (domain, revision)
+
+    def get_record(self, symbol, domain):
+        """
+        Records are kept per revision so they never go stale. They
+        come back the way json would bring them back (eg tuples
+        become lists).
+        """
+
+        dkey = self._record_key(symbol, domain)
+        if dkey is None:
+            return None
+
+        content = self.redis.get(dkey)
+        if content is not None:
+            return json.loads(content)
+
+    def set_record(self, symbol, domain, record, expiry=Expiry.LONG):
+        dkey = self._record_key(symbol, domain)
+        if dkey is None:
+            return
+
+        self.redis.set(dkey, json.dumps(record))
+        if expiry is not None:
+            self.redis.expire(dkey, expiry)
+
 
 class StaticFetcher(BaseFetcher):
 
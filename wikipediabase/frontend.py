@@ -1,19 +1,62 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from edn_format import loads, Keyword, Symbol
+import json
 
-from wikipediabase.telnet import TelnetServer
-from wikipediabase.lispify import lispify
+from edn_format import Keyword, Symbol
+
+from wikipediabase.httpserver import HttpServer
+from wikipediabase.telnet import (AsyncTelnetServer,
+                                  PreforkTelnetServer,
+                                  TelnetServer,
+                                  ThreadedTelnetServer)
+from wikipediabase.infobox_tree import ibx_type_tree
+from wikipediabase.lispify import dump, lispify
 from wikipediabase.provider import Acquirer, provide
-from wikipediabase.util import get_knowledgebase
+from wikipediabase.query_parser import parse_query
+from wikipediabase.result_cache import ResultCache
+from wikipediabase.util import (get_knowledgebase,
+                                get_metainfobox_catalog,
+                                request_context)
 
 import logging
+import threading
+
+
+BATCH = Symbol('batch')
+
+
+def _dump_json(ret):
+    return unicode(json.dumps(lispify(ret).to_json(), ensure_ascii=False,
+                              sort_keys=True))
+
+
+class _WatchedFile(object):
+
+    """
+    A file that remembers whether anything was written to it.
+    """
+
+    def __init__(self, fd):
+        self.fd = fd
+        self.written = False
+
+    def write(self, data):
+        self.written = True
+        self.fd.write(data)
 
 
 class Frontend(Acquirer):
 
     def __init__(self, knowledgebase=None, *args, **kwargs):
+        """
+        Extra parameters are:
+
+        - result_cache: where to keep the answers of queries (default:
+          an in memory ResultCache)
+        """
+
+        self.result_cache = kwargs.pop('result_cache', None) or ResultCache()
         super(Frontend, self).__init__(*args, **kwargs)
 
         if 'providers' not in kwargs:
@@ -26,7 +69,7 @@ class Frontend(Acquirer):
 
     @provide(name='commands')
     def commands(self):
-        return lispify([i for i, _ in self.resources().iteritems()])
+        return lispify(self.dispatch_table().keys())
 
     def get_callable(self, symbol):
         """
@@ -35,7 +78,7 @@ class Frontend(Acquirer):
         """
 
         if isinstance(symbol, Symbol):
-            return self.resources()[symbol._name]
+            return self.dispatch_table()[symbol._name]
 
         if isinstance(symbol, Keyword):
             return lambda *args: lispify(*args, typecode=symbol._name)
@@ -48,15 +91,88 @@ class Frontend(Acquirer):
         if not isinstance(ls, tuple):
             return ls
 
+        # Special forms get their arguments unevaluated
+        if ls and ls[0] == BATCH:
+            return self.batch(*ls[1:])
+
         fn = self.get_callable(self._eval(ls[0]))
         args = [self._eval(a) for a in ls[1:]]
         ret = fn(*args)
 
         return ret
 
+    def batch(self, *forms):
+        """
+        Evaluate many forms in one request, eg
+
+            (batch (get "wikipedia-person" "Bill Clinton" (:code "BIRTH-DATE"))
+                   (get "wikipedia-person" "Bill Clinton" (:code "DEATH-DATE")))
+
+        and return a list with the result of each one. A form that
+        fails does not affect the rest, it gets an error in its place.
+        The forms share the articles fetched by the ones before them.
+        """
+
+        ret = []
+        for form in forms:
+            try:
+                ret.append(self._eval(form))
+            except Exception as e:
+                self.log().warning("Failed to evaluate %s in batch", form,
+                                   exc_info=True)
+                ret.append(lispify(e, typecode='error'))
+
+        return lispify(ret)
+
     def eval(self, string):
-        ls = loads(string)
-        ret = unicode(self._eval(ls))
+        return self._cached_eval(string, unicode)
+
+    def eval_json(self, string):
+        """
+        Like eval but the answer is json, built from the lisp values.
+        """
+
+        return self._cached_eval(string, _dump_json, kind=u'json')
+
+    def stream(self, string, fd):
+        """
+        Like eval but write the answer to the file fd, utf-8 encoded,
+        while it is serialized.
+        """
+
+        ls = parse_query(string)
+        key = self.result_cache.key(ls)
+        if key is not None:
+            ret = self.result_cache.get(key)
+            if ret is not None:
+                fd.write(ret.encode('utf-8'))
+                return
+
+        with request_context():
+            ret = self._eval(ls)
+
+        chunks = [] if key is not None else None
+        dump(ret, fd, tee=chunks)
+        if key is not None:
+            self.result_cache.set(key, u''.join(chunks))
+
+    def _cached_eval(self, string, render, kind=None):
+        ls = parse_query(string)
+        key = self.result_cache.key(ls)
+        if key is not None:
+            if kind is not None:
+                key = (kind, key)
+
+            ret = self.result_cache.get(key)
+            if ret is not None:
+                return ret
+
+        # Nested lookups within the query share their results
+        with request_context():
+            ret = render(self._eval(ls))
+
+        if key is not None:
+            self.result_cache.set(key, ret)
 
         return ret
 
@@ -70,15 +186,152 @@ class TelnetFrontend(Frontend):
             error = lispify(e, typecode='error')
             return unicode(lispify([error])) + u'\n'
 
+    def stream(self, string, fd):
+        # Answers are written a few kilobytes at a time. If one fails
+        # before any of it is written the client gets just the
+        # error. After that anything we add would be malformed, so the
+        # error goes up and the server hangs up on the client.
+        out = _WatchedFile(fd)
+        try:
+            super(TelnetFrontend, self).stream(string, out)
+        except Exception as e:
+            if out.written:
+                raise
+
+            error = lispify(e, typecode='error')
+            fd.write(unicode(lispify([error])).encode('utf-8'))
+
+        fd.write('\n')
+
     def __init__(self, *args, **kwargs):
+        """
+        Extra parameters are:
+
+        - port (default: 8023)
+        - workers: serve that many clients concurrently (default: None,
+          ie one at a time)
+        - persistent: with workers, keep connections open for more
+          queries (default: True)
+        """
+
+        port = kwargs.pop('port', 8023)
+        workers = kwargs.pop('workers', None)
+        persistent = kwargs.pop('persistent', True)
         super(TelnetFrontend, self).__init__(*args, **kwargs)
-        self.srv = TelnetServer(('0.0.0.0', 8023), self.eval)
+
+        self.exit_status = None
+        self.srv = self.make_server(('0.0.0.0', port), workers, persistent)
+
+    def make_server(self, address, workers, persistent):
+        if workers:
+            return ThreadedTelnetServer(address, self.eval, workers=workers,
+                                        persistent=persistent,
+                                        stream=self.stream)
+
+        return TelnetServer(address, self.eval, stream=self.stream)
 
     def run(self):
         self.log().info("Running telnet server...")
         self.srv.serve_forever()
+        self.srv.server_close()
+
+        # Servers that answer in other processes know the status
+        if self.exit_status is None:
+            self.exit_status = getattr(self.srv, 'exit_status', None)
+
+        if self.exit_status is not None:
+            exit(self.exit_status)
+
+    @provide(memoize=False)
+    def quit(self, status=0):
+        self.log().info("Exiting with status %d" % status)
+        # We are inside a request, shutdown waits for serve_forever to
+        # return so it can't be called from here.
+        self.exit_status = status
+        threading.Thread(target=self.srv.shutdown).start()
+        return lispify(True)
+
+
+class AsyncTelnetFrontend(TelnetFrontend):
+
+    """
+    Accept any number of connections on an event loop and evaluate
+    the queries on a pool of workers. Queries that take longer than
+    deadline seconds (default: 30) are answered with a timeout error.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.deadline = kwargs.pop('deadline', 30)
+        super(AsyncTelnetFrontend, self).__init__(*args, **kwargs)
+
+    def make_server(self, address, workers, persistent):
+        return AsyncTelnetServer(address, self.eval, workers=workers or 8,
+                                 deadline=self.deadline,
+                                 on_timeout=self.timeout_answer)
+
+    def timeout_answer(self, msg):
+        error = lispify({'symbol': 'timeout',
+                         'kw': {'message': "No answer within %s seconds" %
+                                self.deadline}},
+                        typecode='error')
+        return unicode(lispify([error])) + u'\n'
+
+
+class HttpFrontend(TelnetFrontend):
+
+    """
+    Answer queries over HTTP in json, see wikipediabase.httpserver,
+    on workers (default: 8) threads.
+    """
+
+    def eval_json(self, *args, **kw):
+        try:
+            return super(HttpFrontend, self).eval_json(*args, **kw)
+        except Exception as e:
+            return _dump_json(lispify(e, typecode='error'))
+
+    def make_server(self, address, workers, persistent):
+        return HttpServer(address, self.eval_json, workers=workers or 8)
+
+
+class PreforkTelnetFrontend(TelnetFrontend):
+
+    """
+    Answer queries on processes (default: 4) forked worker processes
+    that share the listening socket. The caches are warmed up before
+    forking so the workers share them instead of each building their
+    own. A worker is replaced after max_requests (default: 1000)
+    connections.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.processes = kwargs.pop('processes', 4)
+        self.max_requests = kwargs.pop('max_requests', 1000)
+        super(PreforkTelnetFrontend, self).__init__(*args, **kwargs)
+
+    def make_server(self, address, workers, persistent):
+        return PreforkTelnetServer(address, self.eval,
+                                   processes=self.processes,
+                                   max_requests=self.max_requests,
+                                   persistent=persistent,
+                                   stream=self.stream)
+
+    def warm_up(self):
+        """
+        Load everything the workers should inherit.
+        """
+
+        ibx_type_tree()
+        get_metainfobox_catalog().catalog()
+
+    def run(self):
+        self.warm_up()
+        super(PreforkTelnetFrontend, self).run()
 
-    @provide()
+    @provide(memoize=False)
     def quit(self, status=0):
+        # We are in a worker, the parent has to stop the others and
+        # exit with the status.
         self.log().info("Exiting with status %d" % status)
-        exit(status)
+        self.srv.quit(status)
+        return lispify(True)
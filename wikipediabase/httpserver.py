@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""
+An HTTP server for WikipediaBase that answers in json, for clients
+that would rather not speak the telnet protocol or parse lisp.
+
+    GET /?q=<query>               answer one query
+    POST / with an edn query      answer one query
+    POST / with a json list of    answer all of them, in a json list
+           queries
+
+Connections are kept alive (HTTP/1.1) so clients can pool them.
+"""
+
+import BaseHTTPServer
+import json
+import urlparse
+
+from wikipediabase.log import Logging
+from wikipediabase.telnet import ThreadPoolMixIn
+
+
+class HttpHandler(BaseHTTPServer.BaseHTTPRequestHandler, Logging):
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        self.timeout = self.server.idle_timeout
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+
+    def do_GET(self):
+        url = urlparse.urlparse(self.path)
+        queries = urlparse.parse_qs(url.query).get('q')
+        if url.path != '/' or not queries:
+            self.send_answer(400, u'{"error": "Expected /?q=<query>"}')
+            return
+
+        query = self.decode(queries[0])
+        if query is not None:
+            self.send_answer(200, self.server.eval(query))
+
+    def do_POST(self):
+        if self.path != '/':
+            self.send_answer(404, u'{"error": "Not found"}')
+            return
+
+        try:
+            length = int(self.headers.getheader('content-length') or 0)
+        except ValueError:
+            length = -1
+
+        if length < 0:
+            # There is no telling where the body ends, so the
+            # connection can't be reused either.
+            self.close_connection = 1
+            self.send_answer(400, u'{"error": "Invalid Content-Length"}')
+            return
+
+        body = self.decode(self.rfile.read(length))
+        if body is None:
+            return
+
+        if self.headers.gettype() != 'application/json':
+            self.send_answer(200, self.server.eval(body))
+            return
+
+        try:
+            queries = json.loads(body)
+        except ValueError:
+            self.send_answer(400, u'{"error": "Invalid json"}')
+            return
+
+        if isinstance(queries, basestring):
+            self.send_answer(200, self.server.eval(queries))
+        elif isinstance(queries, list) and \
+                all(isinstance(q, basestring) for q in queries):
+            answers = [self.server.eval(q) for q in queries]
+            self.send_answer(200, u'[%s]' % u', '.join(answers))
+        else:
+            self.send_answer(400, u'{"error": "Expected a list of queries"}')
+
+    def decode(self, data):
+        """
+        The utf-8 data as unicode, or None after answering with an
+        error if it is not utf-8.
+        """
+
+        try:
+            return data.decode('utf-8')
+        except UnicodeDecodeError:
+            self.send_answer(400, u'{"error": "Expected utf-8"}')
+            return None
+
+    def send_answer(self, code, answer):
+        assert(isinstance(answer, unicode))  # TODO : remove for production
+        body = answer.encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        self.log().info("%s %s", self.client_address[0], format % args)
+
+
+class HttpServer(ThreadPoolMixIn, BaseHTTPServer.HTTPServer):
+
+    """
+    Answers requests on a pool of worker threads. eval takes a query
+    and returns the answer as a json string. A kept alive connection
+    keeps its worker busy until it is closed or stays idle for
+    idle_timeout seconds.
+    """
+
+    allow_reuse_address = True
+
+    def __init__(self, server_address, eval, workers=8, idle_timeout=60):
+        self.workers = workers
+        self.idle_timeout = idle_timeout
+        BaseHTTPServer.HTTPServer.__init__(self, server_address, HttpHandler)
+        self.eval = eval
@@ -1,28 +1,21 @@
-import re
-
 from fuzzywuzzy import fuzz, process
 
 from wikipediabase.util import (Expiry,
                                 fromstring,
                                 get_meta_infobox,
-                                get_article,
+                                get_metainfobox_catalog,
                                 totext,
                                 tostring)
 from wikipediabase.log import Logging
 from wikipediabase.fetcher import WIKIBASE_FETCHER
 from wikipediabase.infobox_tree import ibx_type_superclasses
-
-ATTRIBUTE_REGEX = r"\|\s*(?P<key>[a-z\-_0-9]+)\s*=" \
-    "[\t ]*(?P<val>.*?)\s*(?=(\n|\\n)\s*\|)"
-
-# Various names under which you may find an infobox
-# TODO: include geobox
-BOX_REGEX = r"\b(infobox|Infobox|taxobox|Taxobox)\b"
-
-# Infoboxes may be defined in a separate article and included
-# using a special template
-# for an example, see WWI's "{{World War I infobox}}"
-SPECIAL_INFOBOX_REGEX = r"{{\s*(?P<template>([\w ]+)[Ii]nfobox)}}"
+from wikipediabase.patterns import (ESCAPED_LIST_TAG_REGEX,
+                                    HTML_LIST_TAG_REGEX,
+                                    INFOBOX_ATTRIBUTE_REGEX,
+                                    INFOBOX_BRACES_REGEX,
+                                    INFOBOX_TEMPLATE_REGEX,
+                                    SPECIAL_INFOBOX_REGEX,
+                                    WHITESPACE_REGEX)
 
 
 class Infobox(Logging):
@@ -44,17 +37,65 @@ class Infobox(Logging):
     def __nonzero__(self):
         return bool(self._html)
 
+    @classmethod
+    def from_record(cls, symbol, record, fetcher=None, title=None):
+        """
+        Rebuild an infobox from a record created by to_record without
+        parsing any html.
+        """
+
+        ibox = cls(symbol, record['markup'], record['html'],
+                   fetcher=fetcher, title=title)
+        ibox._template = record['template']
+        ibox._wikipedia_class = record['class']
+        ibox._html_parsed = [tuple(p) for p in record['html_parsed']]
+        if record['rendered_attributes'] is not None:
+            ibox._rendered_attributes = record['rendered_attributes']
+
+        return ibox
+
+    def to_record(self):
+        """
+        A json serializable dict with everything that is expensive to
+        figure out about this infobox. The rendered attributes need the
+        meta infobox, so they are only kept if something already asked
+        for them.
+        """
+
+        template = self.template()
+        html = self.html_source()
+        if not isinstance(html, basestring):
+            html = tostring(html)
+
+        rendered = getattr(self, '_rendered_attributes', None)
+
+        return {
+            'markup': self.markup_source(),
+            'html': html,
+            'template': template,
+            'class': self.wikipedia_class() if template else None,
+            'html_parsed': self.html_parsed(),
+            'rendered_attributes': rendered if template else dict(),
+        }
+
     def template(self):
+        if hasattr(self, '_template'):
+            return self._template
+
+        self._template = None
         ibox_source = self.markup_source()
         if ibox_source:
-            template_regex = r'{{\s*(?P<infobox>%s\s+[\w ]*)' % BOX_REGEX
-            for m in re.finditer(template_regex, ibox_source):
-                template = "Template:" + m.group('infobox').strip()
-                return template
-        return None
+            for m in INFOBOX_TEMPLATE_REGEX.finditer(ibox_source):
+                self._template = "Template:" + m.group('infobox').strip()
+                break
+
+        return self._template
 
     def wikipedia_class(self):
-        return self._to_class(self.template())
+        if not hasattr(self, '_wikipedia_class'):
+            self._wikipedia_class = self._to_class(self.template())
+
+        return self._wikipedia_class
 
     def types(self):
         """
@@ -65,12 +106,14 @@ class Infobox(Logging):
             self._sc = ibx_type_superclasses()
 
         template = self.template()
-        types = filter(lambda t: t is not None, [self._to_type(template)])
-
         t = self._to_type(template)
-        title = get_article(template, self.fetcher).title()
-        if t != self._to_type(title):
-            types.append(self._to_type(title))
+        types = [t] if t is not None else []
+
+        # Follow template redirects (eg Infobox president ->
+        # Infobox officeholder) without fetching the template page.
+        title_type = self._to_type(self.fetcher.canonical_title(template))
+        if t != title_type:
+            types.append(title_type)
 
         if t in self._sc:
             types.extend(self._sc[t])
@@ -105,9 +148,15 @@ class Infobox(Logging):
             return self._rendered_attributes
 
         self._rendered_attributes = dict()
-        ibx = get_meta_infobox(self.template())
-        self._rendered_attributes.update(ibx.rendered_attributes())
+        template = self.template()
+
+        # Constructing a meta infobox is expensive, the catalog
+        # usually knows the answer.
+        attrs = get_metainfobox_catalog().get(template)
+        if attrs is None:
+            attrs = get_meta_infobox(template).rendered_attributes()
 
+        self._rendered_attributes.update(attrs)
         return self._rendered_attributes
 
     @staticmethod
@@ -133,8 +182,7 @@ class Infobox(Logging):
         """
 
         mu = self.markup_source()
-        for m in re.finditer(ATTRIBUTE_REGEX, mu,
-                             flags=re.IGNORECASE | re.DOTALL):
+        for m in INFOBOX_ATTRIBUTE_REGEX.finditer(mu):
             key = m.group("key").replace("_", "-").lower()
             val = m.group("val")
 
@@ -158,6 +206,11 @@ class Infobox(Logging):
         """
         A rendered infobox as a <table>
         """
+        # Infoboxes rebuilt from records only parse their html when
+        # someone actually asks for it.
+        if isinstance(self._html, basestring):
+            self._html = fromstring(self._html)
+
         return self._html
 
     def rendered(self):
@@ -169,18 +222,20 @@ class Infobox(Logging):
         pairs.
         """
 
+        if hasattr(self, '_html_parsed'):
+            return self._html_parsed
+
         def escape_lists(val):
             if not val:
                 return u""
 
-            return re.sub(
-                r"<\s*(/?\s*(br\s*/?|/?ul|/?li))\s*>", "&lt;\\1&gt;", val)
+            return HTML_LIST_TAG_REGEX.sub("&lt;\\1&gt;", val)
 
         def unescape_lists(val):
             if not val:
                 return u""
 
-            val = re.sub(r"&lt;(/?\s*(br\s*/?|ul|li))&gt;", "<\\1>", val)
+            val = ESCAPED_LIST_TAG_REGEX.sub("<\\1>", val)
             return val
 
         soup = fromstring(self.html_source())
@@ -200,7 +255,7 @@ class Infobox(Logging):
                 # making brs into newlines, parse the rest of the
                 # tags, get the text back
                 key = totext(fromstring(tostring(e_key), True))
-                key = re.sub(r"\s+", " ", key).strip()
+                key = WHITESPACE_REGEX.sub(" ", key).strip()
                 val = escape_lists(tostring(e_val))
                 # Extract text
                 val = fromstring(val)
@@ -208,6 +263,7 @@ class Infobox(Logging):
                 val = unescape_lists(val.strip())
                 tpairs.append((key, val))
 
+        self._html_parsed = tpairs
         return tpairs
 
 
@@ -227,7 +283,32 @@ class InfoboxScraper(Logging):
 
     def infoboxes(self, expiry=Expiry.DEFAULT):
         """
-        Returns a list of Infobox objects constructed from the article
+        Returns a list of Infobox objects constructed from the
+        article. Fetchers that cache keep a record of the infoboxes
+        per revision of the article so we only scrape each revision
+        once.
+        """
+
+        records = self.fetcher.get_record(self.symbol, 'infoboxes')
+        if records is not None:
+            return [Infobox.from_record(self.symbol, r, title=self.title)
+                    for r in records]
+
+        infoboxes = self.scrape_infoboxes(expiry=expiry)
+        if self.fetcher.revision(self.symbol) is not None:
+            try:
+                self.fetcher.set_record(self.symbol, 'infoboxes',
+                                        [i.to_record() for i in infoboxes])
+            except (LookupError, ValueError):
+                self.log().warn("Could not create infobox records for '%s'",
+                                self.symbol, exc_info=True)
+
+        return infoboxes
+
+    def scrape_infoboxes(self, expiry=Expiry.DEFAULT):
+        """
+        Construct the infoboxes from the markup and the html of the
+        article.
         """
 
         markup_source = self.fetcher.markup_source(self.symbol, expiry=expiry)
@@ -285,9 +366,7 @@ class InfoboxScraper(Logging):
         braces = 0
         rngs = []
 
-        for m in re.finditer(
-                "((?P<open>{{)\s*(?P<ibox>%s)?|(?P<close>}}))" % BOX_REGEX,
-                source):
+        for m in INFOBOX_BRACES_REGEX.finditer(source):
 
             if m.group('open'):
                 # If we are counting just continue, dont count outside
@@ -314,7 +393,7 @@ class InfoboxScraper(Logging):
             infoboxes.append(source[s:e])
 
         external_templates = []
-        for m in re.finditer(SPECIAL_INFOBOX_REGEX, source):
+        for m in SPECIAL_INFOBOX_REGEX.finditer(source):
             template = m.group('template')
             if template:
                 external_templates.append(template)
@@ -1,17 +1,21 @@
-import re
+import json
+import logging
+import os
+import threading
+import time
 from itertools import chain
 
 from wikipediabase.fetcher import WIKIBASE_FETCHER
+from wikipediabase.patterns import MW_HEADING_RX
+from wikipediabase.util import Expiry, data_file, parallel_map
 
-MW_HEADING_RX = map(re.compile, [
-    ur"\s*==([\w\s]+)==",
-    ur"\s*===([\w\s]+)===",
-    ur"\s*====([\w\s]+)====",
-    ur"\* \[\[Template:Infobox ([\w\s]*)\]\]",
-    ur"\*\* \[\[Template:Infobox ([\w\s]*)\]\]",
-    # Not there but just in case
-    ur"\*\*\* \[\[Template:Infobox ([\w\s]*)\]\]",
-])
+log = logging.getLogger(__name__)
+
+# Prebuilt type tree, in the data directory unless the path is
+# absolute. Build it with `wikipediabase build-type-tree`.
+IBX_TREE_FILE = "wikipediabase-ibx-tree.json"
+# Bump this when the format of the tree changes to ignore old snapshots.
+IBX_TREE_VERSION = 1
 
 
 def ibx_tree(src, prefix=None, form=None):
@@ -54,9 +58,11 @@ def ibx_tree(src, prefix=None, form=None):
     return queue
 
 
-def ibx_type_tree(fetcher=None, form=None):
-    if hasattr(ibx_type_tree, "ret"):
-        return ibx_type_tree.ret
+def fetch_ibx_type_tree(fetcher=None, form=None, workers=8):
+    """
+    Build the type tree from Wikipedia:List_of_infoboxes and its
+    subpages. The subpages are fetched concurrently.
+    """
 
     if not fetcher:
         fetcher = WIKIBASE_FETCHER
@@ -64,14 +70,110 @@ def ibx_type_tree(fetcher=None, form=None):
     src = fetcher.markup_source("Wikipedia:List_of_infoboxes")
     titles = map(lambda x: x.split("}}", 1)[0],
                  src.split(u"{{Wikipedia:List of infoboxes/")[1:])
-    symbols = (u"Wikipedia:List_of_infoboxes/" + i
-               for i in titles)
-    tuples = chain.from_iterable((ibx_tree(fetcher.markup_source(sym),
-                                           form=form)
-                                  for sym, tit in zip(symbols, titles)))
-    ibx_type_tree.ret = dict(tuples)
+    symbols = [u"Wikipedia:List_of_infoboxes/" + i for i in titles]
+    sources = parallel_map(fetcher.markup_source, symbols, workers=workers)
+    tuples = chain.from_iterable((ibx_tree(src, form=form)
+                                  for src in sources))
+    return dict(tuples)
+
+
+def save_ibx_type_tree(tree, filename=IBX_TREE_FILE):
+    """
+    Write a snapshot of the tree. Write to a temporary file and move
+    it so that readers never see half a snapshot.
+    """
+
+    filename = data_file(filename)
+    tmp = "%s.%d.tmp" % (filename, os.getpid())
+    with open(tmp, 'w') as fd:
+        json.dump({'version': IBX_TREE_VERSION,
+                   'created': time.time(),
+                   'tree': tree}, fd)
+
+    os.rename(tmp, filename)
+
+
+def load_ibx_type_tree(filename=IBX_TREE_FILE):
+    """
+    Read a snapshot of the tree. Returns (tree, age in seconds) or
+    (None, None) if there is no usable snapshot.
+    """
+
+    try:
+        with open(data_file(filename)) as fd:
+            snapshot = json.load(fd)
+    except (IOError, ValueError):
+        return None, None
+
+    if snapshot.get('version') != IBX_TREE_VERSION:
+        log.warning("Ignoring infobox tree snapshot '%s' of version %s",
+                    filename, snapshot.get('version'))
+        return None, None
+
+    return snapshot['tree'], time.time() - snapshot['created']
+
+
+def refresh_ibx_type_tree(fetcher=None, filename=IBX_TREE_FILE,
+                          background=True):
+    """
+    Fetch a fresh tree, start using it and update the snapshot. With
+    background the old tree keeps being served until the new one is
+    ready.
+    """
+
+    def refresh():
+        tree = fetch_ibx_type_tree(fetcher)
+        ibx_type_tree.ret = tree
+        save_ibx_type_tree(tree, filename)
+        return tree
+
+    if not background:
+        return refresh()
+
+    def safe_refresh():
+        try:
+            refresh()
+        except Exception:
+            log.exception("Failed to refresh the infobox tree")
+
+    thread = threading.Thread(target=safe_refresh)
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+def ibx_type_tree(fetcher=None, form=None):
+    """
+    The type tree, from the snapshot if there is one. Custom fetchers
+    and forms always build the tree from scratch, without the cached
+    tree or the snapshot.
+    """
+
+    if fetcher is not None or form is not None:
+        return fetch_ibx_type_tree(fetcher, form=form)
+
+    if hasattr(ibx_type_tree, "ret"):
+        return ibx_type_tree.ret
+
+    tree, age = load_ibx_type_tree()
+    if tree is not None:
+        ibx_type_tree.ret = tree
+        if age > Expiry.LONG:
+            refresh_ibx_type_tree()
+
+        return tree
+
+    ibx_type_tree.ret = fetch_ibx_type_tree()
+    try:
+        save_ibx_type_tree(ibx_type_tree.ret)
+    except (IOError, OSError):
+        log.warning("Could not save the infobox tree snapshot",
+                    exc_info=True)
+
     return ibx_type_tree.ret
 
 ibx_type_superclasses = ibx_type_tree
 
-__all__ = ["ibx_type_superclasses", "ibx_type_tree", "ibx_tree"]
+__all__ = ["ibx_type_superclasses", "ibx_type_tree", "ibx_tree",
+           "fetch_ibx_type_tree", "load_ibx_type_tree",
+           "refresh_ibx_type_tree", "save_ibx_type_tree"]
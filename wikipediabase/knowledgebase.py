@@ -6,8 +6,9 @@ from wikipediabase.lispify import lispify
 from wikipediabase.provider import Provider, provide
 from wikipediabase.resolvers import WIKIBASE_RESOLVERS
 from wikipediabase.sort_symbols import sort_by_length, sort_named
-from wikipediabase.synonym_inducers import WIKIBASE_INDUCERS
-from wikipediabase.util import get_article
+from wikipediabase.synonym_inducers import (WIKIBASE_INDUCERS,
+                                            get_synonym_index)
+from wikipediabase.util import get_article, request_memoized
 
 
 class KnowledgeBase(Provider):
@@ -20,6 +21,10 @@ class KnowledgeBase(Provider):
         - fetcher (default: WIKIBASE_FETCHER)
         - resolvers (default: WIKIBASE_RESOLVERS)
         - classifiers (default: WIKIBASE_CLASSIFIERS)
+        - synonym_inducers (default: WIKIBASE_INDUCERS)
+        - synonym_index: a SynonymIndex to look synonyms up before
+          inducing them (default: the one use_synonym_index chose, if
+          any)
         """
 
         super(KnowledgeBase, self).__init__(*args, **kw)
@@ -32,7 +37,9 @@ class KnowledgeBase(Provider):
         self.resolvers = kw.get('resolvers', WIKIBASE_RESOLVERS)
         self.classifiers = kw.get('classifiers', WIKIBASE_CLASSIFIERS)
         self.synonym_inducers = kw.get('synonym_inducers', WIKIBASE_INDUCERS)
+        self.synonym_index = kw.get('synonym_index')
 
+    @request_memoized
     @provide(name='get')
     def get(self, cls, symbol, attr):
         """
@@ -50,6 +57,35 @@ class KnowledgeBase(Provider):
 
         return lispify([res])
 
+    @provide(name='get-many')
+    def get_many(self, cls, symbol, *attrs):
+        """
+        Gets the values of many attributes of a symbol at once. Each
+        resolver is asked only about the attributes that the ones
+        before it could not resolve.
+
+        :param cls: Wikipedia class of the symbol
+        :param symbol: the Wikipedia article
+        :param attrs: the attributes to get
+        :returns: the value or an error for each attribute, lispified
+        """
+        ret = [None] * len(attrs)
+
+        for ar in self.resolvers:
+            pending = [i for i, res in enumerate(ret) if res is None]
+            if not pending:
+                break
+
+            resolved = ar.multi_resolve(cls, symbol,
+                                        [attrs[i] for i in pending])
+            if resolved is None:
+                continue
+
+            for i, res in zip(pending, resolved):
+                ret[i] = res
+
+        return lispify(ret)
+
     @provide(name="get-attributes")
     def get_attributes(self, cls, symbol):
         for r in self.resolvers:
@@ -63,6 +99,7 @@ class KnowledgeBase(Provider):
         categories = get_article(symbol).categories()
         return lispify(categories)
 
+    @request_memoized
     @provide(name="get-classes")
     def get_classes(self, symbol):
         return lispify(get_article(symbol).classes())
@@ -81,6 +118,14 @@ class KnowledgeBase(Provider):
         return lispify(sort_named(synonym, *args))
 
     def synonyms(self, symbol):
+        # Opened here rather than in __init__ so that forked servers
+        # open it after the fork
+        index = self.synonym_index or get_synonym_index()
+        if index is not None:
+            synonyms = index.get(symbol)
+            if synonyms is not None:
+                return lispify(synonyms)
+
         synonyms = set()
 
         for si in self.synonym_inducers:
@@ -9,12 +9,12 @@ Prefix your class with an underscore (_) if it is an intermediate representation
 so that the lispify method ignores it.
 """
 
-import re
 from numbers import Number
 import warnings
-import overlay_parse
 
+from wikipediabase.dates import is_date_attr, just_props, template_date
 from wikipediabase.log import Logging
+from wikipediabase.patterns import REFERENCE_REGEX, SQUARE_BRACKET_REGEX
 from wikipediabase.util import subclasses, output
 
 
@@ -50,11 +50,16 @@ class LispType(Logging):
 
     - __str__: string representation
     - should_parse
+    - _may_parse: whether should_parse may accept values of a type
+    - typecodes: the typecodes _may_parse looks at
     - parse_val
+    - json_val: the value in to_json
+    - iter_chunks: the string representation in pieces
     """
 
     priority = 0
     literal = False
+    typecodes = ()
 
     def __init__(self, val, typecode, infobox_attr=None):
         """
@@ -79,6 +84,16 @@ class LispType(Logging):
 
         return True
 
+    @classmethod
+    def _may_parse(cls, pytype, typecode, date_attr):
+        """
+        False if should_parse is False for all values of pytype with
+        this typecode, so lispify does not need to try. date_attr is
+        True for infobox attributes that are dates.
+        """
+
+        return True
+
     def parse_val(self, val):
         """
         Override this to have special value manipulation.
@@ -100,12 +115,35 @@ class LispType(Logging):
     def __str__(self):
         return output(self.typed_value())
 
+    def iter_chunks(self):
+        """
+        Generate the string representation in pieces, so that big
+        answers can be written out without building the whole
+        string. Override this for containers.
+        """
+
+        yield unicode(self)
+
     def val_str(self):
         return unicode(self.val)
 
     def typecode_str(self):
         return self.typecode
 
+    def json_val(self):
+        return self.val
+
+    def to_json(self):
+        """
+        The value as an object that can be dumped to json. Typed values
+        become {typecode: value} like the plist (:typecode value).
+        """
+
+        if self.typecode is None:
+            return self.json_val()
+
+        return {self.typecode_str(): self.json_val()}
+
     def __nonzero__(self):
         return self.valid
 
@@ -128,6 +166,10 @@ class LispString(LispType):
     def should_parse(self):
         return isinstance(self.val, basestring)
 
+    @classmethod
+    def _may_parse(cls, pytype, typecode, date_attr):
+        return issubclass(pytype, basestring)
+
     def typecode_str(self):
         if self.infobox_attr is not None and \
                 self.typecode.lower() in ('code', 'rendered'):
@@ -135,12 +177,15 @@ class LispString(LispType):
         return super(LispString, self).typecode_str()
 
     def val_str(self):
-        v = re.sub(r"\[\d*\]", "", self.val)  # remove references, e.g. [1]
-        v = re.sub(r"[[\]]", "", v)  # remove wikimarkup links, e.g. [[Ruby]]
-        v = v.replace('"', '\\"')  # escape double quotes
+        v = self.json_val().replace('"', '\\"')  # escape double quotes
         v = u'"{0}"'.format(v)
         return v
 
+    def json_val(self):
+        v = REFERENCE_REGEX.sub("", self.val)  # remove references, e.g. [1]
+        v = SQUARE_BRACKET_REGEX.sub("", v)  # remove wikimarkup links, e.g. [[Ruby]]
+        return v
+
 
 class LispList(LispType):
 
@@ -154,6 +199,10 @@ class LispList(LispType):
     def should_parse(self):
         return hasattr(self.val, '__iter__')
 
+    @classmethod
+    def _may_parse(cls, pytype, typecode, date_attr):
+        return hasattr(pytype, '__iter__')
+
     def __str__(self):
         if self.typecode:
             return u'%s' % (super(LispList, self).__str__())
@@ -178,6 +227,41 @@ class LispList(LispType):
     def val_str(self):
         return " ".join([self.erepr(v) for v in self.val])
 
+    def iter_chunks(self):
+        if self.typecode:
+            yield u'(:%s ' % self.typecode_str()
+        else:
+            yield u'('
+
+        for i, v in enumerate(self.val):
+            if i:
+                yield u' '
+
+            for c in self._erepr_chunks(v):
+                yield c
+
+        yield u')'
+
+    def _erepr_chunks(self, v):
+        """
+        Like erepr in pieces.
+        """
+
+        if isinstance(v, basestring):
+            v = LispString(v, None)
+        elif isinstance(v, dict):
+            v = LispDict(v, None)
+        elif hasattr(v, '__iter__') and not isinstance(v, LispType):
+            v = LispList(v, None)
+
+        if isinstance(v, LispType):
+            return v.iter_chunks()
+
+        return [self.erepr(v)]
+
+    def json_val(self):
+        return [lispify(v).to_json() for v in self.val]
+
     def __contains__(self, val):
         return val in self.val_str()
 
@@ -189,6 +273,7 @@ class LispDate(LispType):
     """
 
     priority = next(MID_PRIORITY)
+    typecodes = ("yyyymmdd",)
 
     def val_str(self):
         d, m, y = self.val
@@ -197,15 +282,21 @@ class LispDate(LispType):
     def typecode_str(self):
         return "yyyymmdd"
 
+    def json_val(self):
+        return self.val_str()
+
     def should_parse(self):
-        if self.infobox_attr and (self.infobox_attr.lower() == 'date' or
-                                  self.infobox_attr.lower().endswith("-date")):
+        if is_date_attr(self.infobox_attr):
             self.typecode = "yyyymmdd"
             return True
 
         if self.typecode == "yyyymmdd":
             return True
 
+    @classmethod
+    def _may_parse(cls, pytype, typecode, date_attr):
+        return date_attr or typecode == "yyyymmdd"
+
     def _range_middle(self, date):
         # Very imprecise
 
@@ -217,7 +308,11 @@ class LispDate(LispType):
         if not isinstance(txt, basestring):
             return txt
 
-        dor = overlay_parse.dates.just_props(txt, {'date'}, {'range'})
+        date = template_date(txt)
+        if date is not None:
+            return date
+
+        dor = just_props(txt, {'date'}, {'range'})
 
         if dor:
             if len(dor[0]) == 2:
@@ -241,7 +336,7 @@ class _LispDateVoting(LispDate):
 
         # Do not parse separately, it's expensive and you will get
         # date duplicates from range edges.
-        dnr = overlay_parse.dates.just_props(txt, {'date'}, {'range'})
+        dnr = just_props(txt, {'date'}, {'range'})
         dates = [d for d in dnr if len(d) == 3]
         ranges = [r for r in dnr if len(r) == 2]
 
@@ -288,10 +383,39 @@ class LispDict(LispType):
     def should_parse(self):
         return isinstance(self.val, dict)
 
+    @classmethod
+    def _may_parse(cls, pytype, typecode, date_attr):
+        return issubclass(pytype, dict)
+
     def __str__(self):
         pairs = sorted(self.val.items())
         return output(u'(%s)' % self._plist(pairs))
 
+    def iter_chunks(self):
+        pairs = sorted(self.val.items())
+        if not all(k is None or isinstance(k, basestring) for k, _ in pairs):
+            # Let __str__ deal with it
+            yield unicode(self)
+            return
+
+        yield u'('
+        first = True
+        for k, v in pairs:
+            if v is None:
+                continue
+
+            if not first:
+                yield u' '
+            first = False
+
+            if k is not None:
+                yield u':%s ' % k
+
+            for c in lispify(v).iter_chunks():
+                yield c
+
+        yield u')'
+
     def _plist(self, pairs):
         """
         A lispy plist without the parens.
@@ -299,6 +423,13 @@ class LispDict(LispType):
 
         return " ".join(list(self._paren_content_iter(pairs)))
 
+    def json_val(self):
+        return dict((k, lispify(v).to_json())
+                    for k, v in self.val.iteritems() if v is not None)
+
+    def to_json(self):
+        return self.json_val()
+
     def _kv_pair(self, k, v):
         if k is None:
             return output(u"%s" % v)
@@ -324,6 +455,7 @@ class LispError(LispDict):
     """
 
     priority = MAX_PRIORITY
+    typecodes = ('error',)
     # Here you can translate python exception names to wikibase error
     # symbols
     lookup = dict()
@@ -331,7 +463,11 @@ class LispError(LispDict):
     def should_parse(self):
         return self.typecode == 'error' or isinstance(self.val, BaseException)
 
-    def __str__(self):
+    @classmethod
+    def _may_parse(cls, pytype, typecode, date_attr):
+        return typecode == 'error' or issubclass(pytype, BaseException)
+
+    def _from_exception(self):
         if isinstance(self.val, BaseException):
             self.val = dict(
                 symbol=self.lookup.get(type(self.val).__name__) or
@@ -342,6 +478,16 @@ class LispError(LispDict):
                 kw={'message': str(self.val.message)}
             )
 
+    def iter_chunks(self):
+        yield unicode(self)
+
+    def to_json(self):
+        self._from_exception()
+        kw = LispDict(self.val['kw'], None).to_json()
+        return {'error': dict(kw, symbol=self.val['symbol'])}
+
+    def __str__(self):
+        self._from_exception()
         return output(u"(:error {symbol} {keys})".format(
             symbol=self.val['symbol'],
             keys=self._plist(sorted(self.val['kw'].items()))))
@@ -376,6 +522,10 @@ class LispKeyword(_LispLiteral):
         return isinstance(self.val, basestring) and self.val.startswith(':') \
             and ' ' not in self.val
 
+    @classmethod
+    def _may_parse(cls, pytype, typecode, date_attr):
+        return issubclass(pytype, basestring)
+
     def val_str(self):
         return self.val
 
@@ -389,6 +539,10 @@ class LispBool(_LispLiteral):
     def should_parse(self):
         return isinstance(self.val, bool)
 
+    @classmethod
+    def _may_parse(cls, pytype, typecode, date_attr):
+        return issubclass(pytype, bool)
+
     def val_str(self):
         return u't' if self.val else u'nil'
 
@@ -402,6 +556,10 @@ class LispNone(_LispLiteral):
     def should_parse(self):
         return self.val is None
 
+    @classmethod
+    def _may_parse(cls, pytype, typecode, date_attr):
+        return pytype is type(None)
+
     def val_str(self):
         return u'nil'
 
@@ -411,11 +569,77 @@ class LispNumber(_LispLiteral):
     def should_parse(self):
         return isinstance(self.val, Number)
 
+    @classmethod
+    def _may_parse(cls, pytype, typecode, date_attr):
+        return issubclass(pytype, Number)
+
     def val_str(self):
         return str(self.val)
 
 
 WIKIBASE_LISP_TYPES = subclasses(LispType, instantiate=False)
+# (type, typecode, date attribute) -> the LispTypes worth trying
+_DISPATCH = dict()
+# Typecodes come from clients too, so only those the types look at
+# are cached
+_DISPATCH_TYPECODES = set([None] + [tc for T in WIKIBASE_LISP_TYPES
+                                    for tc in T.typecodes])
+
+
+def _candidates(pytype, typecode, date_attr):
+    """
+    The LispTypes that may accept values of pytype, by priority.
+    """
+
+    try:
+        cached = typecode in _DISPATCH_TYPECODES
+    except TypeError:
+        cached = False
+
+    if not cached:
+        return [T for T in WIKIBASE_LISP_TYPES
+                if T._may_parse(pytype, typecode, date_attr)]
+
+    key = (pytype, typecode, date_attr)
+    try:
+        return _DISPATCH[key]
+    except KeyError:
+        pass
+
+    ret = _DISPATCH[key] = [T for T in WIKIBASE_LISP_TYPES
+                            if T._may_parse(pytype, typecode, date_attr)]
+    return ret
+
+
+def dump(obj, fd, tee=None, bufsize=8192):
+    """
+    Write lispify(obj) to the file fd utf-8 encoded, a few kilobytes
+    at a time. Non-lisp values are written as unicode like Frontend
+    answers them. The unicode pieces are appended to the list tee if
+    there is one.
+    """
+
+    if isinstance(obj, LispType):
+        chunks = obj.iter_chunks()
+    else:
+        chunks = [unicode(obj)]
+
+    buf = []
+    size = 0
+    for c in chunks:
+        buf.append(c)
+        size += len(c)
+        if size >= bufsize:
+            fd.write(u''.join(buf).encode('utf-8'))
+            if tee is not None:
+                tee.extend(buf)
+            buf = []
+            size = 0
+
+    if buf:
+        fd.write(u''.join(buf).encode('utf-8'))
+        if tee is not None:
+            tee.extend(buf)
 
 
 def lispify(obj, typecode=None, infobox_attr=None):
@@ -428,7 +652,7 @@ def lispify(obj, typecode=None, infobox_attr=None):
     if isinstance(obj, LispType):
         return obj
 
-    for T in WIKIBASE_LISP_TYPES:
+    for T in _candidates(obj.__class__, typecode, is_date_attr(infobox_attr)):
         t = T(obj, typecode, infobox_attr=infobox_attr)
         if t.valid:
             return t
@@ -437,4 +661,4 @@ def lispify(obj, typecode=None, infobox_attr=None):
         "Implement LispType for typecode: %s, val: %s or"
         "provide fallback error." % (typecode, obj))
 
-__all__ = ['lispify']
+__all__ = ['dump', 'lispify']
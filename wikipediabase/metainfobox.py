@@ -3,16 +3,23 @@ Scrape the attributes out of infoboxes.
 """
 
 import json
-import re
+import os
+import redis
 
 from wikipediabase.renderer import WIKIBASE_RENDERER
-from wikipediabase.fetcher import StaticFetcher
+from wikipediabase.fetcher import StaticFetcher, WIKIBASE_FETCHER
 from wikipediabase.infobox import Infobox
-from wikipediabase.util import get_article, Expiry
+from wikipediabase.infobox_tree import ibx_type_tree
+from wikipediabase.log import Logging
+from wikipediabase.patterns import (META_ATTRIBUTE_REGEX,
+                                    META_VALUE_REGEX,
+                                    TEMPLATE_DATA_REGEX)
+from wikipediabase.util import get_article, data_file, Expiry, parallel_map
 
-ATTRIBUTE_REGEX = re.compile(r"^\s*\\|\s*([a-zA-Z_\-]+)\s+=")
-TEMPLATE_DATA_REGEX = re.compile(r"<templatedata>(.*?)</templatedata>",
-                                 flags=re.M | re.S)
+# Prebuilt rendered attributes of all the infobox templates. Build
+# it with `wikipediabase build-metainfobox-catalog`.
+METAINFOBOX_CATALOG_FILE = "wikipediabase-metainfobox-catalog.json"
+METAINFOBOX_CATALOG_KEY = u'metainfobox:catalog'
 
 
 class MetaInfobox(Infobox):
@@ -91,7 +98,7 @@ class MetaInfobox(Infobox):
         """
         attrs = dict()
         for k, v in self.html_parsed():
-            for m in re.finditer("!!!!!([^!]+)!!!!!", v):
+            for m in META_VALUE_REGEX.finditer(v):
                 attrs[m.group(1)] = k
 
         return attrs
@@ -119,8 +126,7 @@ class MetaInfobox(Infobox):
         template = self.symbol
 
         try:
-            page = get_article(self.symbol)
-            template = page.title()
+            template = WIKIBASE_FETCHER.canonical_title(self.symbol)
         except LookupError:
             self.log().warn("Could not find doc any template pages for "
                             "template: \"%s\".",
@@ -152,7 +158,7 @@ class MetaInfobox(Infobox):
 
     def _attributes_from_template_data(self, markup):
         attributes = []
-        match = re.search(TEMPLATE_DATA_REGEX, markup)
+        match = TEMPLATE_DATA_REGEX.search(markup)
         if match:
             template_data = json.loads(match.group(1))
             for a in template_data["params"]:
@@ -163,10 +169,116 @@ class MetaInfobox(Infobox):
         return attributes
 
     def _attributes_from_html(self, html):
-        return re.findall(ATTRIBUTE_REGEX, html)
+        return META_ATTRIBUTE_REGEX.findall(html)
 
     def _clean_attribute(self, attr):
         attr = attr.strip()
         while attr[-1].isdigit():
             attr = attr[:-1]
         return attr
+
+
+class MetaInfoboxCatalog(Logging):
+
+    """
+    The rendered attributes (see MetaInfobox.rendered_attributes) of
+    all the infobox templates we know of, computed ahead of time. The
+    catalog lives in a json file and in the redis hash redis_key. The
+    file is loaded the first time it is needed.
+    """
+
+    def __init__(self, filename=METAINFOBOX_CATALOG_FILE, fetcher=None,
+                 redis_key=METAINFOBOX_CATALOG_KEY):
+        self.filename = data_file(filename)
+        self.redis_key = redis_key
+        self.fetcher = fetcher or WIKIBASE_FETCHER
+        self.redis = redis.StrictRedis(host='localhost', port=6379, db=0,
+                                       decode_responses=True)
+        self._catalog = None
+
+    def catalog(self):
+        if self._catalog is None:
+            try:
+                with open(self.filename) as fd:
+                    self._catalog = json.load(fd)
+            except (IOError, ValueError):
+                self._catalog = dict()
+
+        return self._catalog
+
+    def empty(self):
+        """
+        Whether no catalog was built, neither in the file nor in redis.
+        """
+
+        return not self.catalog() and not self.redis.exists(self.redis_key)
+
+    def _lookup(self, template):
+        if template in self.catalog():
+            return self.catalog()[template]
+
+        attrs = self.redis.hget(self.redis_key, template)
+        if attrs is not None:
+            return json.loads(attrs)
+
+    def get(self, template):
+        """
+        The rendered attributes of template or None if the catalog
+        does not know about it. Template redirects are followed.
+        """
+
+        if template is None:
+            return None
+
+        attrs = self._lookup(template)
+        if attrs is not None:
+            return attrs
+
+        # Do not ask where templates redirect to for nothing
+        if self.empty():
+            return None
+
+        try:
+            title = self.fetcher.canonical_title(template)
+        except LookupError:
+            return None
+
+        if title != template:
+            return self._lookup(title)
+
+    def build(self, templates=None, workers=8):
+        """
+        Compute the rendered attributes of templates (by default all
+        the templates in the infobox tree) and save them in the file
+        and in redis.
+        """
+
+        if templates is None:
+            templates = [u"Template:Infobox " + t for t in ibx_type_tree()]
+
+        def rendered_attributes(template):
+            try:
+                return template, MetaInfobox(template).rendered_attributes()
+            except LookupError:
+                self.log().warn("Could not build meta infobox for '%s'",
+                                template)
+                return template, None
+
+        catalog = dict((t, a) for t, a in
+                       parallel_map(rendered_attributes, templates, workers)
+                       if a is not None)
+
+        tmp = "%s.%d.tmp" % (self.filename, os.getpid())
+        with open(tmp, 'w') as fd:
+            json.dump(catalog, fd)
+
+        os.rename(tmp, self.filename)
+
+        if catalog:
+            self.redis.hmset(self.redis_key,
+                             dict((t, json.dumps(a))
+                                  for t, a in catalog.iteritems()))
+            self.redis.expire(self.redis_key, Expiry.LONG)
+
+        self._catalog = catalog
+        return catalog
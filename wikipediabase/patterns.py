@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compiled regular expressions used on the hot parsing paths. Compile
+patterns here once instead of formatting and compiling them on every
+call. This module should not depend on anything in wikipediabase.
+"""
+
+import re
+
+# Fetcher
+
+REDIRECT_REGEX = re.compile(r"#REDIRECT\s*\[\[(.*)\]\]")
+# The revision of the article as found in the <script> block that
+# contains metadata for wikipedia
+REVISION_REGEX = re.compile(r"\"wgRevisionId\":(\d+)")
+
+# Infoboxes
+
+# Various names under which you may find an infobox
+# TODO: include geobox
+BOX_REGEX = r"\b(infobox|Infobox|taxobox|Taxobox)\b"
+
+INFOBOX_ATTRIBUTE_REGEX = re.compile(
+    r"\|\s*(?P<key>[a-z\-_0-9]+)\s*="
+    "[\t ]*(?P<val>.*?)\s*(?=(\n|\\n)\s*\|)",
+    flags=re.IGNORECASE | re.DOTALL)
+
+# Infoboxes may be defined in a separate article and included
+# using a special template
+# for an example, see WWI's "{{World War I infobox}}"
+SPECIAL_INFOBOX_REGEX = re.compile(
+    r"{{\s*(?P<template>([\w ]+)[Ii]nfobox)}}")
+
+INFOBOX_TEMPLATE_REGEX = re.compile(
+    r'{{\s*(?P<infobox>%s\s+[\w ]*)' % BOX_REGEX)
+
+# Opening braces of infoboxes and any closing braces.
+INFOBOX_BRACES_REGEX = re.compile(
+    r"((?P<open>{{)\s*(?P<ibox>%s)?|(?P<close>}}))" % BOX_REGEX)
+
+HTML_LIST_TAG_REGEX = re.compile(r"<\s*(/?\s*(br\s*/?|/?ul|/?li))\s*>")
+ESCAPED_LIST_TAG_REGEX = re.compile(r"&lt;(/?\s*(br\s*/?|ul|li))&gt;")
+HTML_BR_REGEX = re.compile(r"<\s*br\s*/?>")
+WHITESPACE_REGEX = re.compile(r"\s+")
+
+# Headings of Wikipedia:List_of_infoboxes subpages, deepest last
+MW_HEADING_RX = map(re.compile, [
+    ur"\s*==([\w\s]+)==",
+    ur"\s*===([\w\s]+)===",
+    ur"\s*====([\w\s]+)====",
+    ur"\* \[\[Template:Infobox ([\w\s]*)\]\]",
+    ur"\*\* \[\[Template:Infobox ([\w\s]*)\]\]",
+    # Not there but just in case
+    ur"\*\*\* \[\[Template:Infobox ([\w\s]*)\]\]",
+])
+
+# Meta infoboxes
+
+META_ATTRIBUTE_REGEX = re.compile(r"^\s*\\|\s*([a-zA-Z_\-]+)\s+=")
+TEMPLATE_DATA_REGEX = re.compile(r"<templatedata>(.*?)</templatedata>",
+                                 flags=re.M | re.S)
+META_VALUE_REGEX = re.compile(r"!!!!!([^!]+)!!!!!")
+
+# Queries
+
+# The tokens of the subset of edn that queries use: lists, strings
+# without escapes and atoms. Commas are whitespace in edn.
+QUERY_TOKEN_REGEX = re.compile(
+    r'[\s,]*(?:(?P<open>\()|(?P<close>\))|"(?P<string>[^"\\]*)"'
+    r'|(?P<atom>[^\s,()"\[\]{}#;\\]+))')
+QUERY_INT_REGEX = re.compile(r"^[+-]?\d+$")
+QUERY_FLOAT_REGEX = re.compile(r"^[+-]?\d+\.\d+$")
+QUERY_SYMBOL_REGEX = re.compile(
+    r"^(?:[a-zA-Z*!_?<>=]|[+-](?![0-9]))[a-zA-Z0-9*!_?<>=.+\-]*$")
+QUERY_SPACE_REGEX = re.compile(r"[\s,]*$")
+
+# Text
+
+NON_WORD_REGEX = re.compile(ur"([\W\s]+)", flags=re.U | re.I)
+LEADING_ARTICLE_REGEX = re.compile(ur"(^the|^a|^an)\b", flags=re.U)
+MARKUP_LINK_REGEX = re.compile(r"\[+(.*\||)(?P<content>.*?)\]+")
+PARENS_REGEX = re.compile(r"\(.*\)")
+SPACED_PARENS_REGEX = re.compile(r"\s*\(.*\)\s*")
+WORD_REGEX = re.compile(r"\w+")
+# Degrees, minutes and seconds of coordinates
+DMS_SEPARATOR_REGEX = re.compile(ur'(?:°|′|″)')
+
+# Dates
+
+# Text without any of these has no dates worth parsing
+DATE_HINT_REGEX = re.compile(
+    r"\d|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)",
+    flags=re.IGNORECASE)
+
+# Templates like {{birth date and age|1946|8|19}}
+DATE_TEMPLATE_REGEX = re.compile(
+    r"{{\s*(?:(?:birth|death|start)[ _-]date(?:[ _-]and[ _-]age)?"
+    r"|end[ _-]date|bda|dda)\s*\|(?P<params>[^{}]*)}}",
+    flags=re.IGNORECASE)
+
+# Lispify
+
+REFERENCE_REGEX = re.compile(r"\[\d*\]")
+SQUARE_BRACKET_REGEX = re.compile(r"[[\]]")
+
+# Person
+
+PRONOUN_REGEX = re.compile(
+    r"\b(he|him|his|she|her|hers|it|its|they|their|theirs)\b", re.I)
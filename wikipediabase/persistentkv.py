@@ -78,11 +78,16 @@ class EncodedDict(collections.MutableMapping):
 
 class DbmPersistentDict(EncodedDict):
     """
-    Persistent dict using dbm. Will open or create filename.
+    Persistent dict using dbm. Will open or create filename, or with
+    readonly only open it, without locking so that it can be opened by
+    many processes and replaced while they have it open.
     """
 
-    def __init__(self, filename):
-        flag = 'w' if os.path.exists(filename) else 'n'
+    def __init__(self, filename, readonly=False):
+        if readonly:
+            flag = 'ru'
+        else:
+            flag = 'w' if os.path.exists(filename) else 'n'
 
         super(DbmPersistentDict, self).__init__(dbm.open(filename, flag))
 
@@ -99,11 +104,11 @@ class DbmPersistentDict(EncodedDict):
 
 
 class SqlitePersistentDict(EncodedDict):
-    def __init__(self, filename):
+    def __init__(self, filename, readonly=False):
         if not filename.endswith('.sqlite'):
             filename += '.sqlite'
 
-        db = SqliteDict(filename)
+        db = SqliteDict(filename, flag='r' if readonly else 'c')
         super(SqlitePersistentDict, self).__init__(db)
 
     def __del__(self):
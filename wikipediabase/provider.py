@@ -1,5 +1,3 @@
-from itertools import chain
-
 from wikipediabase.log import Logging
 from wikipediabase.util import memoized
 
@@ -58,6 +56,8 @@ class Provider(Logging):
 
     def __init__(self, resources={}, acquirer=None, *args, **kwargs):
         self._resources = {}
+        # The acquirers that need to know when resources change
+        self._acquirers = []
 
         for k, f in self.meta_resources:
             self._resources[k] = getattr(self, f)
@@ -73,6 +73,8 @@ class Provider(Logging):
         """
 
         self._resources[name] = resource
+        for a in self._acquirers:
+            a._dispatch = None
 
     def provide_to(self, acquirer):
         return acquirer.acquire_from(self)
@@ -88,6 +90,9 @@ class Acquirer(Provider):
     def __init__(self, providers=None, *arg, **kw):
         super(Acquirer, self).__init__(*arg, **kw)
         self._providers = (providers or []) + [self]
+        self._dispatch = None
+        for p in self._providers:
+            p._acquirers.append(self)
 
     def iter_resources(self):
         for p in self._providers:
@@ -99,7 +104,21 @@ class Acquirer(Provider):
         Get a dict of all the resources from all providers.
         """
 
-        return dict(chain(*[p._resources.items() for p in self._providers]))
+        return dict(self.dispatch_table())
+
+    def dispatch_table(self):
+        """
+        The dict of all the resources, do not modify it. It is built
+        once and kept up to date so that looking up a resource is a
+        single dict lookup. Later providers override earlier ones.
+        """
+
+        if self._dispatch is None:
+            self._dispatch = dict()
+            for p in self._providers:
+                self._dispatch.update(p._resources)
+
+        return self._dispatch
 
     def acquire_from(self, provider, name=None):
         """
@@ -107,3 +126,6 @@ class Acquirer(Provider):
         """
 
         self._providers.append(provider)
+        provider._acquirers.append(self)
+        if self._dispatch is not None:
+            self._dispatch.update(provider._resources)
@@ -0,0 +1,103 @@
+"""
+Parse queries. Queries are edn but in practice they only use lists,
+strings, numbers, keywords and symbols, and the same few query shapes
+come again and again. fast_loads handles that subset much faster than
+edn_format and parse_query caches the parsed queries. Anything else
+is left to edn_format.
+"""
+
+from edn_format import Keyword, Symbol, loads
+
+from wikipediabase.patterns import (QUERY_FLOAT_REGEX,
+                                    QUERY_INT_REGEX,
+                                    QUERY_SPACE_REGEX,
+                                    QUERY_SYMBOL_REGEX,
+                                    QUERY_TOKEN_REGEX)
+from wikipediabase.util import LRUCache
+
+_CONSTANTS = {u'nil': None, u'true': True, u'false': False}
+_PARSED = LRUCache(maxsize=4096)
+
+
+class UnsupportedSyntax(Exception):
+    pass
+
+
+def _atom(atom):
+    if atom in _CONSTANTS:
+        return _CONSTANTS[atom]
+
+    if QUERY_INT_REGEX.match(atom):
+        return int(atom)
+
+    if QUERY_FLOAT_REGEX.match(atom):
+        return float(atom)
+
+    if atom.startswith(u':') and QUERY_SYMBOL_REGEX.match(atom[1:]):
+        return Keyword(atom[1:])
+
+    if QUERY_SYMBOL_REGEX.match(atom):
+        return Symbol(atom)
+
+    raise UnsupportedSyntax(atom)
+
+
+def fast_loads(text):
+    """
+    Parse a single form of the subset of edn that queries use, like
+    edn_format does, ie lists become tuples. Raise UnsupportedSyntax
+    for anything outside that subset.
+    """
+
+    if isinstance(text, str):
+        text = text.decode('utf-8')
+
+    # The top level and the lists we are in
+    stack = [[]]
+    pos = 0
+
+    while True:
+        m = QUERY_TOKEN_REGEX.match(text, pos)
+        if m is None:
+            break
+
+        pos = m.end()
+        if m.group('open'):
+            stack.append([])
+        elif m.group('close'):
+            if len(stack) == 1:
+                raise UnsupportedSyntax(text)
+            ls = tuple(stack.pop())
+            stack[-1].append(ls)
+        elif m.group('string') is not None:
+            stack[-1].append(m.group('string'))
+        else:
+            stack[-1].append(_atom(m.group('atom')))
+
+        if len(stack) == 1:
+            break
+
+    if len(stack) != 1 or len(stack[0]) != 1 or \
+       not QUERY_SPACE_REGEX.match(text, pos):
+        raise UnsupportedSyntax(text)
+
+    return stack[0][0]
+
+
+def parse_query(text):
+    """
+    Parse a query, caching the result. The parsed queries are shared,
+    do not modify them.
+    """
+
+    ret = _PARSED.get(text, _PARSED)
+    if ret is not _PARSED:
+        return ret
+
+    try:
+        ret = fast_loads(text)
+    except UnsupportedSyntax:
+        ret = loads(text)
+
+    _PARSED.set(text, ret)
+    return ret
@@ -0,0 +1,84 @@
+"""
+Resolve the canonical title of a symbol, ie follow redirects, without
+fetching the article. Titles come from a persistent map of redirects
+(see persist_redirects), which may be loaded in bulk from the
+redirect table of a dump (see load_redirects), and otherwise from the
+fetcher, that asks the API.
+"""
+
+import threading
+
+from wikipediabase.fetcher import WIKIBASE_FETCHER
+from wikipediabase.util import data_file
+
+REDIRECTS_FILE = "wikipediabase-redirects"
+
+_REDIRECTS = None
+_REDIRECTS_LOCK = threading.Lock()
+
+
+def persist_redirects(filename=REDIRECTS_FILE):
+    """
+    Keep the redirects in a persistent dict at filename, or stop
+    doing that if filename is None. Only one process may use the file
+    at a time.
+    """
+    global _REDIRECTS
+    from wikipediabase.persistentkv import PersistentDict
+
+    with _REDIRECTS_LOCK:
+        _REDIRECTS = PersistentDict(data_file(filename)) if filename else None
+
+
+def normalize_title(title):
+    """
+    Titles the way mediawiki stores them, eg 'barack_Obama' becomes
+    'Barack Obama'.
+    """
+
+    title = title.replace(u"_", u" ").strip()
+    return title[:1].upper() + title[1:]
+
+
+def load_redirects(redirects):
+    """
+    Add (title, target title) pairs, eg from the redirect table of a
+    dump, to the persistent map. Return the number of pairs added.
+    """
+
+    n = 0
+    with _REDIRECTS_LOCK:
+        if _REDIRECTS is None:
+            raise ValueError("Call persist_redirects before loading redirects")
+
+        for title, target in redirects:
+            _REDIRECTS[normalize_title(title)] = \
+                normalize_title(target).encode('utf-8')
+            n += 1
+
+    return n
+
+
+def canonical_title(symbol, fetcher=None):
+    """
+    The title symbol redirects to, or the title of symbol itself if
+    it is not a redirect. Raises LookupError if there is no such
+    article.
+    """
+
+    fetcher = fetcher or WIKIBASE_FETCHER
+    key = normalize_title(symbol)
+
+    with _REDIRECTS_LOCK:
+        try:
+            if _REDIRECTS is not None:
+                return _REDIRECTS[key].decode('utf-8')
+        except KeyError:
+            pass
+
+    title = fetcher.canonical_title(symbol)
+    with _REDIRECTS_LOCK:
+        if _REDIRECTS is not None:
+            _REDIRECTS[key] = title.encode('utf-8')
+
+    return title
@@ -1,4 +1,4 @@
-from wikipediabase.fetcher import Fetcher
+from wikipediabase.fetcher import WIKIBASE_FETCHER
 from wikipediabase.lispify import lispify, LispType
 from wikipediabase.provider import Provider
 
@@ -21,12 +21,12 @@ class BaseResolver(Provider):
 
     def __init__(self, fetcher=None, *args, **kwargs):
         """
-        Provide a way to fetch articles. If no fetcher is provider
-        fallback to BaseFetcher.
+        Provide a way to fetch articles. If no fetcher is provided
+        fall back to WIKIBASE_FETCHER.
         """
 
         super(BaseResolver, self).__init__(*args, **kwargs)
-        self.fetcher = fetcher or Fetcher()
+        self.fetcher = fetcher or WIKIBASE_FETCHER
 
         self._tag = None
 
@@ -73,6 +73,18 @@ class BaseResolver(Provider):
         if attr in self._resources:
             return self._resources[attr](symbol, attr)
 
+    @check_resolver
+    def multi_resolve(self, cls, symbol, attrs):
+        """
+        Resolve each of attrs. Returns a list with the result of
+        resolve for each attribute, in order, or None if this resolver
+        should not resolve for cls.
+
+        Override this when resolving many attributes of the same
+        symbol together is cheaper than resolving them one by one.
+        """
+        return [self.resolve(cls, symbol, a) for a in attrs]
+
     @check_resolver
     def attributes(self, cls, symbol):
         """
@@ -1,4 +1,5 @@
 from wikipediabase.classifiers import is_wikipedia_class
+from wikipediabase.dates import is_date_attr, template_date
 from wikipediabase.fetcher import WIKIBASE_FETCHER
 from wikipediabase.lispify import lispify, LispType
 from wikipediabase.resolvers.base import BaseResolver, check_resolver
@@ -35,14 +36,37 @@ class InfoboxResolver(BaseResolver):
             # There are no newlines in article titles
             return None
 
+        infoboxes = get_infoboxes(symbol, cls=cls, fetcher=self.fetcher)
+        return self._from_infoboxes(infoboxes, cls, symbol, attr)
+
+    @check_resolver
+    def multi_resolve(self, cls, symbol, attrs):
+        """
+        Look up all the attributes in the same infoboxes.
+        """
+
+        if "\n" in symbol:
+            return [None] * len(attrs)
+
+        infoboxes = get_infoboxes(symbol, cls=cls, fetcher=self.fetcher)
+        return [self._from_infoboxes(infoboxes, cls, symbol, a)
+                for a in attrs]
+
+    def _from_infoboxes(self, infoboxes, cls, symbol, attr):
         if isinstance(attr, LispType):
             typecode, attr = attr.typecode, attr.val
         else:
             typecode, attr = self._typecode, attr
 
-        infoboxes = get_infoboxes(symbol, cls=cls, fetcher=self.fetcher)
-
+        is_date = typecode == 'yyyymmdd' or is_date_attr(attr)
         for ibox in infoboxes:
+            if is_date:
+                # Date templates in the markup are cheaper to parse
+                # than the rendered dates.
+                date = template_date(ibox.get(attr, source='markup') or u"")
+                if date is not None:
+                    return lispify(date, typecode='yyyymmdd')
+
             result = ibox.get(attr)
             if result:
                 self.log().info("Found infobox attribute '%s'" % attr)
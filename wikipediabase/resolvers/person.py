@@ -1,15 +1,12 @@
 # -*- coding: utf-8 -*-
 
-import re
-
-import overlay_parse
-
 from wikipediabase.classifiers import InfoboxClassifier
+from wikipediabase.dates import just_dates, just_ranges
 from wikipediabase.lispify import lispify
 from wikipediabase.provider import provide
 from wikipediabase.resolvers import InfoboxResolver
 from wikipediabase.resolvers.base import BaseResolver
-from wikipediabase.util import get_article
+from wikipediabase.util import get_article, request_memoized
 
 
 def iter_paren(text, delim=None):
@@ -41,6 +38,7 @@ def first_paren(text):
         return text[s:e]
 
 
+@request_memoized
 def find_date(symbol, date_type):
     """
     Resolve birth and death dates from infoboxes, or, if it is not found,
@@ -58,7 +56,7 @@ def find_date(symbol, date_type):
     for s, e in iter_paren(text, "."):
         paren = text[s:e]
 
-        for ovl in overlay_parse.dates.just_ranges(paren):
+        for ovl in just_ranges(paren):
             if date_type == 'birth-date':
                 return lispify(ovl[0], typecode='yyyymmdd')
             elif date_type == 'death-date':
@@ -66,7 +64,7 @@ def find_date(symbol, date_type):
 
         # If there is just one date and we need a birth date, get that
         if date_type == 'birth-date':
-            for ovl in overlay_parse.dates.just_dates(paren):
+            for ovl in just_dates(paren):
                 return lispify(ovl, typecode='yyyymmdd')
 
 
@@ -95,23 +93,19 @@ class PersonResolver(BaseResolver):
         return lispify(gender, typecode='calculated')
 
     def _guess_gender(self, symbol):
-        male_prep = ["he", "him", "his"]
-        female_prep = ["she", "her", "hers"]
-        neuter_prep = ["it", "its", "they", "their", "theirs"]
+        """
+        The gender whose pronouns the article uses the most. The
+        pronoun counts are part of the article statistics that the
+        fetcher keeps.
+        """
 
         article = get_article(symbol, fetcher=self.fetcher)
-        full_text = "\n\n".join(article.paragraphs()).lower()
-
-        def word_search(w):
-            return len(re.findall(r"\b%s\b" % w, full_text, re.I))
-
-        male_words = sum(map(word_search, male_prep))
-        female_words = sum(map(word_search, female_prep))
-        neuter_words = sum(map(word_search, neuter_prep))
+        counts = article.stats()['pronouns']
 
-        if neuter_words > male_words and neuter_words > female_words:
+        if counts['neuter'] > counts['masculine'] and \
+           counts['neuter'] > counts['feminine']:
             return 'neuter'
-        elif male_words >= female_words:
+        elif counts['masculine'] >= counts['feminine']:
             return 'masculine'
         else:
             return 'feminine'
@@ -1,10 +1,10 @@
 # -*- coding: utf-8 -*-
 
-import re
-
 from wikipediabase.provider import provide
 from wikipediabase.resolvers.base import BaseResolver
+from wikipediabase.article_stats import proper_name
 from wikipediabase.lispify import lispify
+from wikipediabase.patterns import DMS_SEPARATOR_REGEX, WORD_REGEX
 from wikipediabase.util import get_infoboxes, get_article, totext, markup_unlink
 
 
@@ -71,13 +71,11 @@ class TermResolver(BaseResolver):
         """
         # First paragraph refers more often to the symbol itself
         # rather than things related to it.
-        txt = get_article(article).first_paragraph()
-
-        nay = sum(map(txt.count, [' is ', ' was ', ' has ']))
-        yay = sum(map(txt.count, [' are ', ' were ', ' have ']))
+        verbs = get_article(article).stats()['verbs']
 
         # inequality because there are many more nays
-        return lispify(yay > nay, typecode='calculated')
+        return lispify(verbs['plural'] > verbs['singular'],
+                       typecode='calculated')
 
     @provide(name='proper')
     def proper(self, article, _):
@@ -87,10 +85,9 @@ class TermResolver(BaseResolver):
         """
 
         # Blindly copied by the ruby version
-        a = re.sub(r"\s*\(.*\)\s*", "", article.replace("_", " "))
-        txt = totext(get_article(article).html_source())
-        ret = (txt.count(a.lower()) - txt.count(". " + a.lower()) <
-               txt.count(a))
+        lower, sentence_start, exact = get_article(article).occurrences(
+            proper_name(article))
+        ret = lower - sentence_start < exact
 
         return lispify(ret, typecode='calculated')
 
@@ -121,7 +118,7 @@ class TermResolver(BaseResolver):
     def word_count(self, article, attribute):
         self.log().info("Trying 'word-count' tag from static resolver.")
         self._tag = "html"
-        return len(self._words(self.fetcher.html_source(article)))
+        return get_article(article).stats()['words']
 
     @staticmethod
     def _dton(s):
@@ -129,7 +126,7 @@ class TermResolver(BaseResolver):
         degrees minutes, seconds to float or int.
         """
 
-        ls = re.split(ur'(?:°|′|″)', s.strip())
+        ls = DMS_SEPARATOR_REGEX.split(s.strip())
         sig = -1 if ls.pop() in ['S', 'W'] else 1
         ret = int(ls.pop(0))
         if len(ls):
@@ -143,4 +140,4 @@ class TermResolver(BaseResolver):
         return sig * (ret if isinstance(ret, int) else round(ret, 4))
 
     def _words(self, article):
-        return re.findall('\w+', article.lower())
+        return WORD_REGEX.findall(article.lower())
@@ -0,0 +1,111 @@
+"""
+A cache of the answers to whole queries so that repeated queries are
+not resolved and lispified again.
+"""
+
+import redis
+from edn_format import Keyword, Symbol
+
+from wikipediabase.log import Logging
+from wikipediabase.util import Expiry, LRUCache
+
+
+class Uncacheable(Exception):
+    pass
+
+
+class ResultCache(Logging):
+
+    """
+    Answers keyed by the parsed query. They are kept in memory and,
+    with use_redis, in redis too so that all the server processes
+    share them. They expire along with the articles they came
+    from. Queries that call any of the nocache commands are never
+    cached. Answers with errors in them, which may be due to a failed
+    fetch, expire after error_expiry.
+    """
+
+    redis_prefix = u'query:'
+
+    def __init__(self, maxsize=10000, expiry=Expiry.DEFAULT, use_redis=False,
+                 nocache=('quit', 'commands'), error_expiry=Expiry.SHORT):
+        self.expiry = expiry
+        self.error_expiry = error_expiry
+        self.nocache = set(nocache)
+        self.memory = LRUCache(maxsize, ttl=expiry)
+        self.redis = None
+
+        if use_redis:
+            self.redis = redis.StrictRedis(host='localhost', port=6379, db=0,
+                                           decode_responses=True)
+
+    def key(self, form):
+        """
+        A hashable, normalized version of a parsed query or None if
+        the answer should not be cached.
+        """
+
+        try:
+            return self._normalize(form)
+        except Uncacheable:
+            return None
+
+    def _normalize(self, form):
+        if isinstance(form, tuple):
+            if form and isinstance(form[0], Symbol) and \
+               form[0]._name in self.nocache:
+                raise Uncacheable(form[0]._name)
+
+            return (u'(',) + tuple(self._normalize(f) for f in form)
+
+        if isinstance(form, list):
+            return (u'[',) + tuple(self._normalize(f) for f in form)
+
+        if isinstance(form, Symbol):
+            return (u'symbol', form._name)
+
+        if isinstance(form, Keyword):
+            return (u'keyword', form._name)
+
+        if isinstance(form, basestring):
+            return unicode(form)
+
+        if form is None or isinstance(form, (bool, int, long, float)):
+            # Keep 1, 1.0 and true apart
+            return (type(form).__name__, form)
+
+        raise Uncacheable(form)
+
+    def get(self, key):
+        ret = self.memory.get(key)
+        if ret is not None or self.redis is None:
+            return ret
+
+        try:
+            ret = self.redis.get(self.redis_prefix + repr(key))
+        except redis.RedisError:
+            self.log().warning("Could not get cached result", exc_info=True)
+            return None
+
+        if ret is not None:
+            self.memory.set(key, ret)
+
+        return ret
+
+    def _expiry(self, answer):
+        # Both the lisp and the json answers
+        if u'(:error ' in answer or u'"error":' in answer:
+            return self.error_expiry
+
+        return self.expiry
+
+    def set(self, key, answer):
+        expiry = self._expiry(answer)
+        self.memory.set(key, answer, ttl=expiry)
+        if self.redis is None:
+            return
+
+        try:
+            self.redis.set(self.redis_prefix + repr(key), answer, ex=expiry)
+        except redis.RedisError:
+            self.log().warning("Could not cache result", exc_info=True)
@@ -1,20 +1,39 @@
-from wikipediabase.util import get_article
+from wikipediabase.util import get_article, parallel_map
+
+# How many articles to fetch at once
+SORT_WORKERS = 8
+
+
+def article_length(symbol):
+    """
+    The length of the text of the paragraphs of the article, joined
+    with spaces.
+    """
+
+    lengths = get_article(symbol).stats()['paragraphs']
+    return sum(lengths) + max(len(lengths) - 1, 0)
+
+
+def _article_length_or_none(symbol):
+    try:
+        return article_length(symbol)
+    except LookupError:
+        return None
 
 
 def sort_by_length(*args):
-    key = lambda a: len(' '.join(get_article(a).paragraphs()))
-    return sorted(args, reverse=True, key=key)
+    lengths = dict(zip(args, parallel_map(article_length, args,
+                                          workers=SORT_WORKERS)))
+    return sorted(args, reverse=True, key=lengths.get)
 
 
 def sort_named(named, *args):
     # TODO: clean up, this was directly translated from Ruby WikipediaBase
-    article_lengths = {}
-    for a in args:
-        try:
-            article_lengths[a] = len(' '.join(get_article(a).paragraphs()))
-        except LookupError:
-            pass
-    
+    article_lengths = dict(
+        (a, l) for a, l in zip(args, parallel_map(_article_length_or_none,
+                                                  args, workers=SORT_WORKERS))
+        if l is not None)
+
     def compare(a, b):
         named_eq = lambda x: x == named
         named_ieq = lambda x: x.lower() == named.lower()
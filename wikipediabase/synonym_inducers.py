@@ -3,16 +3,26 @@ Synonyms are are based upon:
 
 - redirects
 - inclusion/exlusion of parentheses
+
+Synonyms of all titles at once can be precomputed from the redirects
+of a dump into a SynonymIndex (see adhoc/synonym_dumper.py), which
+servers look synonyms up in after use_synonym_index.
 """
 
+import os
+import threading
 
-import re
-from wikipediabase.util import subclasses, string_reduce
+from wikipediabase.util import data_file, subclasses, string_reduce
 from wikipediabase.fetcher import WIKIBASE_FETCHER
+from wikipediabase.patterns import PARENS_REGEX
+from wikipediabase.redirects import canonical_title, normalize_title
+from wikipediabase.title_index import match_title
+
+SYNONYMS_FILE = "wikipediabase-synonyms"
 
-TITLE_REGEX = re.compile(r"\"wgTitle\":\"(.*?)\",")
-# looks for the wgTitle element in a <script> block that contains metadata for
-# wikipedia
+_SYNONYM_INDEX_FILE = None
+_INDICES = {}
+_INDICES_LOCK = threading.Lock()
 
 
 def lexical_synonyms(symbol):
@@ -21,7 +31,7 @@ def lexical_synonyms(symbol):
     """
 
     if '(' in symbol:
-        ret = [symbol, re.sub(r"\(.*\)", "", symbol)]
+        ret = [symbol, PARENS_REGEX.sub("", symbol)]
     else:
         ret = [symbol]
 
@@ -41,16 +51,30 @@ class ForwardRedirectInducer(BaseInducer):
     """
 
     def title(self, symbol, fetcher=None):
-        fetcher = fetcher or WIKIBASE_FETCHER
-        html = fetcher.html_source(symbol)
-        match = re.search(TITLE_REGEX, html)
-        if match:
-            return match.group(1)
+        """
+        The title symbol redirects to, without fetching the article.
+        Symbols that are not titles are matched against the title
+        index, if it is used. Raises LookupError if there is no such
+        article.
+        """
+
+        try:
+            return canonical_title(symbol, fetcher=fetcher)
+        except LookupError:
+            title = match_title(symbol)
+            if title is None:
+                raise
+
+            return canonical_title(title, fetcher=fetcher)
 
     def induce(self, symbol, fetcher=None):
         synonyms = []
         fetcher = fetcher or WIKIBASE_FETCHER
-        title = self.title(symbol, fetcher=fetcher)
+        try:
+            title = self.title(symbol, fetcher=fetcher)
+        except LookupError:
+            return synonyms
+
         if title:
             sym = string_reduce(symbol)
             if title != sym:
@@ -69,3 +93,72 @@ class LexicalInducer(BaseInducer):
 
 
 WIKIBASE_INDUCERS = subclasses(BaseInducer)
+
+
+class SynonymIndex(object):
+    """
+    The string_reduced synonyms of each canonical title, ie its
+    lexical synonyms and those of the titles that redirect to it, in a
+    persistent dict at filename. Titles are looked up exactly, only
+    normalized the way mediawiki stores them, so that eg 'The Who' and
+    'Who' have synonyms of their own.
+    """
+
+    def __init__(self, filename=SYNONYMS_FILE, readonly=False):
+        from wikipediabase.persistentkv import PersistentDict
+
+        self.db = PersistentDict(data_file(filename), readonly=readonly)
+        self.lock = threading.Lock()
+
+    def get(self, symbol):
+        """
+        The synonyms of symbol or None if it is not in the index.
+        """
+
+        try:
+            with self.lock:
+                synonyms = self.db[normalize_title(symbol)]
+        except KeyError:
+            return None
+
+        return synonyms.decode('utf-8').split(u'\t')
+
+    def set(self, title, synonyms):
+        with self.lock:
+            self.db[normalize_title(title)] = \
+                u'\t'.join(sorted(synonyms)).encode('utf-8')
+
+
+def use_synonym_index(filename=SYNONYMS_FILE):
+    """
+    Look synonyms up in the SynonymIndex at filename, or stop doing
+    that if filename is None.
+    """
+    global _SYNONYM_INDEX_FILE
+
+    with _INDICES_LOCK:
+        _SYNONYM_INDEX_FILE = filename
+
+
+def get_synonym_index(filename=None):
+    """
+    The SynonymIndex at filename, by default the one use_synonym_index
+    chose, or None if there is none. Each process opens the index read
+    only the first time it asks for it, so forked processes do not
+    share a handle.
+    """
+
+    with _INDICES_LOCK:
+        filename = filename or _SYNONYM_INDEX_FILE
+        if filename is None:
+            return None
+
+        filename = data_file(filename)
+        if not os.path.exists(filename):
+            return None
+
+        key = (os.getpid(), filename)
+        if key not in _INDICES:
+            _INDICES[key] = SynonymIndex(filename, readonly=True)
+
+        return _INDICES[key]
@@ -4,29 +4,429 @@
 A simple socket server for WikipediaBase
 """
 
+import Queue
 import SocketServer
+import asynchat
+import asyncore
+import collections
+import errno
+import fcntl
+import os
+import select
+import signal
+import socket
+import threading
+import time
+from multiprocessing.pool import ThreadPool
 
 from wikipediabase.log import Logging
 
 
 class TelnetHandler(SocketServer.StreamRequestHandler, Logging):
 
+    # Buffer the pieces of an answer, we flush after each one.
+    wbufsize = -1
+
+    def setup(self):
+        self.timeout = self.server.idle_timeout
+        SocketServer.StreamRequestHandler.setup(self)
+
     def handle(self):
-        msg = self.rfile.readline().strip()
+        if not self.server.persistent:
+            self.answer(self.rfile.readline())
+            return
+
+        # Answer newline delimited queries in the order they come
+        # until the client hangs up.
+        try:
+            for line in iter(self.rfile.readline, ''):
+                if line.strip():
+                    self.answer(line)
+        except socket.timeout:
+            self.log().info('Closing idle connection from %s',
+                            self.client_address)
+
+    def answer(self, line):
+        msg = line.strip()
         self.log().info('Received request: %s', msg)
-        answer = self.server.eval(msg)
-        assert(isinstance(answer, unicode))  # TODO : remove for production
-        self.wfile.write(answer.encode('utf-8'))
+        if self.server.stream is not None:
+            # Write the answer while it is serialized
+            self.server.stream(msg, self.wfile)
+        else:
+            answer = self.server.eval(msg)
+            assert(isinstance(answer, unicode))  # TODO : remove for production
+            self.wfile.write(answer.encode('utf-8'))
+
+        self.wfile.flush()
 
 
 class TelnetServer(SocketServer.TCPServer):
 
     """
-    The telnet server.
+    The telnet server. Answers one query per connection, one
+    connection at a time. eval takes a query and returns the
+    answer. If there is a stream(query, file) it is used instead to
+    write the answer as utf-8 to the file.
     """
 
     allow_reuse_address = True  # much faster rebinding
+    persistent = False
+    idle_timeout = None
 
-    def __init__(self, server_address, eval):
+    def __init__(self, server_address, eval, stream=None):
         SocketServer.TCPServer.__init__(self, server_address, TelnetHandler)
         self.eval = eval
+        self.stream = stream
+
+
+class ThreadPoolMixIn(SocketServer.ThreadingMixIn):
+
+    """
+    Like ThreadingMixIn but requests are handled by a fixed number of
+    worker threads. Requests wait in a queue when all of them are
+    busy.
+    """
+
+    daemon_threads = True
+    workers = 8
+
+    def _start_workers(self):
+        self._requests = Queue.Queue()
+        for _ in xrange(self.workers):
+            worker = threading.Thread(target=self._work)
+            worker.daemon = self.daemon_threads
+            worker.start()
+
+    def _work(self):
+        while True:
+            request, client_address = self._requests.get()
+            self.process_request_thread(request, client_address)
+
+    def process_request(self, request, client_address):
+        if not hasattr(self, '_requests'):
+            self._start_workers()
+
+        self._requests.put((request, client_address))
+
+
+class ThreadedTelnetServer(ThreadPoolMixIn, TelnetServer):
+
+    """
+    Serves many clients at once. With persistent connections a client
+    may send many queries over one connection, even without waiting
+    for the answers, and gets the answers in order. A persistent
+    connection keeps its worker busy until it is closed or stays idle
+    for idle_timeout seconds.
+    """
+
+    def __init__(self, server_address, eval, workers=8, persistent=True,
+                 idle_timeout=60, stream=None):
+        self.workers = workers
+        self.persistent = persistent
+        self.idle_timeout = idle_timeout
+        TelnetServer.__init__(self, server_address, eval, stream=stream)
+
+
+class PreforkTelnetServer(Logging, TelnetServer):
+
+    """
+    Bind in the parent and fork worker processes that accept on the
+    shared socket, so that parsing can use more than one core. Warm
+    up anything the workers should share before serve_forever. Each
+    worker exits after max_requests connections and the parent forks
+    a fresh one, which caps the growth of the caches of the workers.
+    A worker may quit the whole pool, after which exit_status is the
+    status it asked for.
+    """
+
+    def __init__(self, server_address, eval, processes=4, max_requests=1000,
+                 persistent=True, idle_timeout=60, stream=None):
+        self.processes = processes
+        self.max_requests = max_requests
+        self.persistent = persistent
+        self.idle_timeout = idle_timeout
+        self.children = set()
+        self._parent = os.getpid()
+        self._shutdown = False
+        self.exit_status = None
+        # Workers send the parent their exit status down this pipe
+        self._status_r, self._status_w = os.pipe()
+        flags = fcntl.fcntl(self._status_r, fcntl.F_GETFL)
+        fcntl.fcntl(self._status_r, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+        TelnetServer.__init__(self, server_address, eval, stream=stream)
+
+    def _fork(self):
+        pid = os.fork()
+        if pid:
+            self.children.add(pid)
+            return
+
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        status = 0
+        try:
+            for _ in xrange(self.max_requests):
+                self.handle_request()
+        except BaseException:
+            self.log().exception("Worker %d failed", os.getpid())
+            status = 1
+        finally:
+            os._exit(status)
+
+    def serve_forever(self, poll_interval=0.5):
+        self._shutdown = False
+        try:
+            previous = signal.signal(signal.SIGTERM, self._terminate)
+        except ValueError:
+            # Not the main thread, someone else handles signals.
+            previous = None
+
+        try:
+            while len(self.children) < self.processes:
+                self._fork()
+
+            while self.children:
+                try:
+                    ready, _, _ = select.select([self._status_r], [], [],
+                                                poll_interval)
+                except select.error as e:
+                    if e.args[0] == errno.EINTR:
+                        continue
+                    raise
+
+                if ready:
+                    self._read_messages()
+
+                self._reap()
+        finally:
+            if previous is not None:
+                signal.signal(signal.SIGTERM, previous)
+
+    def _reap(self):
+        while self.children:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if not pid:
+                return
+
+            self.children.discard(pid)
+            if not self._shutdown:
+                self.log().info("Replacing worker %d", pid)
+                self._fork()
+
+    def _read_messages(self):
+        # Workers write their exit status, or '-' to just stop
+        try:
+            messages = os.read(self._status_r, 4096).split()
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return
+            raise
+
+        for m in messages:
+            if m != '-':
+                self.exit_status = int(m)
+
+        if messages:
+            self.shutdown()
+
+    def _terminate(self, *_):
+        self.shutdown()
+
+    def quit(self, status=0):
+        """
+        Stop all the workers and have exit_status be status. May be
+        called from the parent or from a worker.
+        """
+
+        if os.getpid() != self._parent:
+            os.write(self._status_w, "%d\n" % status)
+            return
+
+        self.exit_status = status
+        self.shutdown()
+
+    def shutdown(self):
+        if os.getpid() != self._parent:
+            # A worker is asking, let the parent take everyone down.
+            os.write(self._status_w, "-\n")
+            return
+
+        self._shutdown = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+
+    def server_close(self):
+        TelnetServer.server_close(self)
+        for fd in (self._status_r, self._status_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class _Waker(asyncore.file_dispatcher):
+
+    """
+    A pipe that worker threads write to in order to wake the event
+    loop up when an answer is ready.
+    """
+
+    def __init__(self, map):
+        self._read_fd, self._write_fd = os.pipe()
+        asyncore.file_dispatcher.__init__(self, self._read_fd, map=map)
+        os.close(self._read_fd)
+        flags = fcntl.fcntl(self._write_fd, fcntl.F_GETFL)
+        fcntl.fcntl(self._write_fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+
+    def wake(self, *_):
+        try:
+            os.write(self._write_fd, 'x')
+        except OSError as e:
+            # The pipe is full so the loop will wake up anyway.
+            if e.errno != errno.EAGAIN:
+                raise
+
+    def writable(self):
+        return False
+
+    def handle_read(self):
+        self.recv(4096)
+
+    def close(self):
+        asyncore.file_dispatcher.close(self)
+        os.close(self._write_fd)
+
+
+class AsyncTelnetChannel(Logging, asynchat.async_chat):
+
+    """
+    A client connection. Queries are newline delimited and are
+    answered in the order they came.
+    """
+
+    def __init__(self, sock, server):
+        asynchat.async_chat.__init__(self, sock, map=server.map)
+        self.server = server
+        self.set_terminator('\n')
+        self._data = []
+        self._closing = False
+        # (deadline, query, AsyncResult) in the order they came
+        self.pending = collections.deque()
+
+    def readable(self):
+        return not self._closing and asynchat.async_chat.readable(self)
+
+    def collect_incoming_data(self, data):
+        self._data.append(data)
+
+    def found_terminator(self):
+        msg = ''.join(self._data).strip()
+        self._data = []
+        if msg:
+            self.log().info('Received request: %s', msg)
+            self.pending.append(self.server.submit(msg))
+
+    def send_answers(self, now):
+        """
+        Send the answers that are ready, or past their deadline, without
+        changing their order.
+        """
+
+        while self.pending:
+            deadline, msg, result = self.pending[0]
+            if result.ready():
+                answer = result.get()
+            elif now >= deadline:
+                self.log().warning('Query timed out: %s', msg)
+                answer = self.server.on_timeout(msg)
+            else:
+                break
+
+            self.pending.popleft()
+            assert(isinstance(answer, unicode))  # TODO : remove for production
+            self.push(answer.encode('utf-8'))
+
+        if self._closing and not self.pending:
+            self.close_when_done()
+
+    def handle_close(self):
+        # The client may stop sending before it has all its answers.
+        self._closing = True
+        if not self.pending:
+            self.close()
+
+
+class AsyncTelnetServer(Logging, asyncore.dispatcher):
+
+    """
+    An event loop that accepts any number of connections and
+    evaluates the queries on a pool of worker threads. Queries that
+    miss their deadline are answered with on_timeout(query). Python
+    threads can't be killed so a worker stays busy with a timed out
+    query until it is done, but the client is not kept waiting.
+    """
+
+    def __init__(self, server_address, eval, workers=8, deadline=30,
+                 on_timeout=None, on_error=None):
+        self.map = dict()
+        asyncore.dispatcher.__init__(self, map=self.map)
+        self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.set_reuse_addr()
+        self.bind(server_address)
+        self.listen(socket.SOMAXCONN)
+        self.server_address = self.socket.getsockname()
+
+        self.eval = eval
+        self.deadline = deadline
+        self.on_timeout = on_timeout or (lambda msg: u"timeout\n")
+        self.on_error = on_error or (lambda msg, e: u"error\n")
+        self.pool = ThreadPool(workers)
+        self.waker = _Waker(self.map)
+        self._shutdown = threading.Event()
+
+    def handle_accept(self):
+        pair = self.accept()
+        if pair is not None:
+            AsyncTelnetChannel(pair[0], self)
+
+    def _eval(self, msg):
+        try:
+            return self.eval(msg)
+        except Exception as e:
+            self.log().exception('Failed to answer: %s', msg)
+            return self.on_error(msg, e)
+
+    def submit(self, msg):
+        result = self.pool.apply_async(self._eval, (msg,),
+                                       callback=self.waker.wake)
+        return time.time() + self.deadline, msg, result
+
+    def channels(self):
+        return [c for c in self.map.values()
+                if isinstance(c, AsyncTelnetChannel)]
+
+    def serve_forever(self, poll_interval=0.5):
+        self._shutdown.clear()
+        while not self._shutdown.is_set():
+            now = time.time()
+            deadlines = [c.pending[0][0] for c in self.channels()
+                         if c.pending]
+            timeout = min([poll_interval] + [d - now for d in deadlines])
+            asyncore.loop(timeout=max(timeout, 0), map=self.map, count=1)
+
+            now = time.time()
+            for channel in self.channels():
+                channel.send_answers(now)
+
+    def shutdown(self):
+        self._shutdown.set()
+        self.waker.wake()
+
+    def server_close(self):
+        for channel in self.map.values():
+            channel.close()
+
+        self.pool.terminate()
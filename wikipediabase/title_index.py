@@ -0,0 +1,253 @@
+"""
+An index of the string_reduced titles and redirects of all articles,
+so that finding the article user input refers to does not need a
+fetch. The index is a file of sorted lines that is mapped into memory
+rather than read, so processes share it and exact and prefix lookups
+are binary searches that touch a few pages. Approximate lookups walk
+the sorted keys like a trie and find the titles within a bounded edit
+distance. Exact titles are resolved by the redirect map instead (see
+redirects.canonical_title).
+"""
+
+import mmap
+import os
+import threading
+
+from wikipediabase.redirects import normalize_title
+from wikipediabase.util import data_file, string_reduce
+
+TITLES_FILE = "wikipediabase-titles"
+
+_TITLE_INDEX_FILE = None
+_MAX_DISTANCE = 0
+_INDICES = {}
+_INDICES_LOCK = threading.Lock()
+
+
+def _char_length(lead):
+    """
+    The length of the utf-8 character that starts with byte lead.
+    """
+
+    lead = ord(lead)
+    if lead < 0xc0:
+        return 1
+
+    if lead < 0xe0:
+        return 2
+
+    return 3 if lead < 0xf0 else 4
+
+
+class TitleIndex(object):
+
+    """
+    Map string_reduced titles, their lexical synonyms and those of the
+    redirects to them, to the canonical titles. Each line of the file
+    is a key and a title, separated by a tab, and the lines are sorted
+    by their utf-8 bytes.
+    """
+
+    def __init__(self, filename=TITLES_FILE):
+        self.filename = data_file(filename)
+        with open(self.filename, 'rb') as fi:
+            if os.fstat(fi.fileno()).st_size:
+                self._map = mmap.mmap(fi.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+            else:
+                # Empty files can not be mapped
+                self._map = b""
+
+    @staticmethod
+    def build(titles=(), redirects=(), filename=TITLES_FILE):
+        """
+        Write the index of titles and (title, target) redirects to
+        filename. It is written next to filename and then moved over
+        it, so that servers that have the old one open keep reading
+        that. Return the number of lines.
+        """
+
+        from wikipediabase.synonym_inducers import lexical_synonyms
+
+        entries = set()
+        for title in titles:
+            title = normalize_title(title)
+            entries.update((s, title) for s in lexical_synonyms(title))
+
+        for title, target in redirects:
+            target = normalize_title(target)
+            entries.update((s, target) for s in lexical_synonyms(target))
+            entries.update((s, target) for s in
+                           lexical_synonyms(normalize_title(title)))
+
+        lines = sorted(u"%s\t%s\n" % e for e in entries if e[0])
+        filename = data_file(filename)
+        building = filename + ".building"
+        with open(building, 'wb') as fo:
+            for line in lines:
+                fo.write(line.encode('utf-8'))
+
+        os.rename(building, filename)
+        return len(lines)
+
+    def _key(self, start):
+        return self._map[start:self._map.find(b"\t", start)]
+
+    def _lower_bound(self, key):
+        """
+        The offset of the first line whose key is not less than key,
+        or the size of the file.
+        """
+
+        lo, hi = 0, len(self._map)
+        while lo < hi:
+            start = self._map.rfind(b"\n", lo, (lo + hi) // 2) + 1 or lo
+            if self._key(start) < key:
+                lo = self._map.find(b"\n", start) + 1
+            else:
+                hi = start
+
+        return lo
+
+    def _titles_from(self, start, match, limit=None):
+        ret = []
+        while start < len(self._map) and (limit is None or
+                                          len(ret) < limit):
+            end = self._map.find(b"\n", start)
+            key, _, title = self._map[start:end].partition(b"\t")
+            if not match(key):
+                break
+
+            title = title.decode('utf-8')
+            if title not in ret:
+                ret.append(title)
+
+            start = end + 1
+
+        return ret
+
+    def exact(self, symbol):
+        """
+        The titles symbol could refer to.
+        """
+
+        key = string_reduce(symbol).encode('utf-8')
+        return self._titles_from(self._lower_bound(key), key.__eq__)
+
+    def prefix(self, symbol, limit=None):
+        """
+        The titles that start with symbol, in alphabetical order of
+        their reduced forms.
+        """
+
+        key = string_reduce(symbol).encode('utf-8')
+        return self._titles_from(self._lower_bound(key), lambda k:
+                                 k.startswith(key), limit=limit)
+
+    def _walk(self, prefix, row, key, max_distance, matches):
+        """
+        Add the titles of the keys that start with prefix and are
+        within max_distance edits of key to matches. row is the edit
+        distance of prefix to each prefix of key.
+        """
+
+        start = self._lower_bound(prefix)
+        if row[-1] <= max_distance:
+            matches.extend((row[-1], t) for t in
+                           self._titles_from(start, prefix.__eq__))
+
+        if min(row) > max_distance:
+            return
+
+        # utf-8 never has 0xff so that is after all keys with prefix
+        end = self._lower_bound(prefix + b"\xff")
+        start = self._lower_bound(prefix + b"\x00")
+        while start < end:
+            i = start + len(prefix)
+            char = self._map[i:i + _char_length(self._map[i])]
+
+            c = char.decode('utf-8')
+            next_row = [row[0] + 1]
+            for j in xrange(1, len(key) + 1):
+                next_row.append(min(row[j] + 1, next_row[j - 1] + 1,
+                                    row[j - 1] + (key[j - 1] != c)))
+
+            self._walk(prefix + char, next_row, key, max_distance, matches)
+            start = self._lower_bound(prefix + char + b"\xff")
+
+    def approximate(self, symbol, max_distance=2, limit=None):
+        """
+        The titles whose reduced forms are within max_distance edits
+        of symbol's, closest first.
+        """
+
+        key = string_reduce(symbol)
+        matches = []
+        self._walk(b"", range(len(key) + 1), key, max_distance, matches)
+
+        ret = []
+        for _, title in sorted(matches):
+            if title not in ret:
+                ret.append(title)
+
+        return ret[:limit]
+
+    def lookup(self, symbol, max_distance=0):
+        """
+        The titles symbol refers to exactly, or if there are none those
+        within max_distance edits of it.
+        """
+
+        return self.exact(symbol) or (
+            max_distance and self.approximate(symbol, max_distance)) or []
+
+
+def use_title_index(filename=TITLES_FILE, max_distance=0):
+    """
+    Match symbols that are not titles against the TitleIndex at
+    filename, allowing up to max_distance edits, or stop doing that if
+    filename is None.
+    """
+    global _TITLE_INDEX_FILE, _MAX_DISTANCE
+
+    with _INDICES_LOCK:
+        _TITLE_INDEX_FILE = filename
+        _MAX_DISTANCE = max_distance
+
+
+def get_title_index(filename=None):
+    """
+    The TitleIndex at filename, by default the one use_title_index
+    chose, or None if there is none.
+    """
+
+    with _INDICES_LOCK:
+        filename = filename or _TITLE_INDEX_FILE
+        if filename is None:
+            return None
+
+        filename = data_file(filename)
+        if not os.path.exists(filename):
+            return None
+
+        # A rebuilt index is a new file
+        key = (filename, os.stat(filename).st_ino)
+        if key not in _INDICES:
+            _INDICES[key] = TitleIndex(filename)
+
+        return _INDICES[key]
+
+
+def match_title(symbol):
+    """
+    The one title symbol refers to in the index use_title_index chose,
+    or None if there is no index or symbol does not refer to exactly
+    one title.
+    """
+
+    index = get_title_index()
+    if index is None:
+        return None
+
+    titles = index.lookup(symbol, max_distance=_MAX_DISTANCE)
+    return titles[0] if len(titles) == 1 else None
@@ -1,10 +1,14 @@
 from itertools import islice, chain
 from urlparse import urlparse
 
-import re
 import collections
+import contextlib
 import functools
 import inspect
+import os
+import tempfile
+import threading
+import time
 
 from bs4 import UnicodeDammit
 import lxml.etree as ET
@@ -12,13 +16,23 @@ import copy
 import lxml
 from lxml import html
 
+from wikipediabase.patterns import (HTML_BR_REGEX,
+                                    LEADING_ARTICLE_REGEX,
+                                    MARKUP_LINK_REGEX,
+                                    NON_WORD_REGEX)
+
 _CONTEXT = dict()
+_REQUEST = threading.local()
 DBM_FILE = "/tmp/wikipediabase.mdb"
+# Where snapshots, indices and other data files are kept. Set it with
+# the WIKIPEDIABASE_DATA_DIR environment variable or --data-dir.
+DATA_DIR = os.environ.get('WIKIPEDIABASE_DATA_DIR', tempfile.gettempdir())
 
 
 class Expiry:
     DEFAULT = 14 * 24 * 60 * 60   # two weeks in seconds
     LONG = 6 * 30 * 24 * 60 * 60   # six months in seconds
+    SHORT = 60 * 60   # an hour in seconds
     NEVER = None
 
 
@@ -64,6 +78,49 @@ def memoized(fn):
     return wrap
 
 
+@contextlib.contextmanager
+def request_context():
+    """
+    Share the results of request_memoized functions within the
+    block, eg while evaluating one query. Nested blocks share the
+    outermost one and each thread has its own.
+    """
+    outer = getattr(_REQUEST, 'memo', None)
+    if outer is None:
+        _REQUEST.memo = dict()
+
+    try:
+        yield _REQUEST.memo
+    finally:
+        if outer is None:
+            _REQUEST.memo = None
+
+
+def request_memoized(fn):
+    """
+    Memoize fn within the current request_context. Outside of one
+    this does nothing. Results are not copied so do not modify them.
+    """
+    @functools.wraps(fn)
+    def wrap(*args, **kw):
+        memo = getattr(_REQUEST, 'memo', None)
+        if memo is None:
+            return fn(*args, **kw)
+
+        key = (wrap, args, tuple(sorted(kw.items())))
+        try:
+            return memo[key]
+        except KeyError:
+            pass
+        except TypeError:
+            return fn(*args, **kw)
+
+        ret = memo[key] = fn(*args, **kw)
+        return ret
+
+    return wrap
+
+
 def iwindow(seq, n):
     """
     Returns a sliding window (of width n) over data from the iterable
@@ -80,21 +137,92 @@ def iwindow(seq, n):
         yield result
 
 
+def parallel_map(fn, iterable, workers=8):
+    """
+    Like map() but on a pool of threads. Use it for io bound things
+    like fetching articles. The order of the results is kept.
+    """
+    from multiprocessing.pool import ThreadPool
+
+    items = list(iterable)
+    if workers <= 1 or len(items) <= 1:
+        return map(fn, items)
+
+    pool = ThreadPool(min(workers, len(items)))
+    try:
+        return pool.map(fn, items)
+    finally:
+        pool.close()
+        pool.join()
+
+
+class LRUCache(object):
+
+    """
+    A thread safe dict that keeps up to maxsize items, dropping the
+    least recently used ones first. With a ttl items also expire ttl
+    seconds after they were set, unless set with a ttl of their own.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires, value = self._data.pop(key)
+            except KeyError:
+                return default
+
+            if expires is not None and expires < time.time():
+                return default
+
+            self._data[key] = (expires, value)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = ttl if ttl is not None else self.ttl
+        expires = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (expires, value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
 def get_meta_infobox(symbol, fetcher=None):
     """
     Get an infobox that only has keys and not values. A quick and
     dirty way avoid parsing the values of an infobox.
     """
+    from wikipediabase.fetcher import WIKIBASE_FETCHER
     from wikipediabase.metainfobox import MetaInfobox
 
-    return _context_get(symbol, "meta_infobox", MetaInfobox, fetcher)
+    return _context_get(symbol, "meta_infobox", MetaInfobox,
+                        fetcher=fetcher or WIKIBASE_FETCHER)
 
 
-def get_infoboxes(symbol, cls=None, fetcher=None):
-    from wikipediabase.infobox import InfoboxScraper
+def get_metainfobox_catalog(**kw):
+    """
+    The precomputed rendered attributes of all infobox templates.
+    """
+    from wikipediabase.metainfobox import MetaInfoboxCatalog
+
+    return _context_get(None, "metainfobox_catalog", MetaInfoboxCatalog, **kw)
 
-    scraper = _context_get(symbol, "infoboxes", InfoboxScraper, fetcher)
-    infoboxes = scraper.infoboxes()
+
+def get_infoboxes(symbol, cls=None, fetcher=None):
+    infoboxes = _all_infoboxes(symbol, fetcher)
 
     if cls:
         return filter(lambda i: i.wikipedia_class() == cls.lower(), infoboxes)
@@ -102,10 +230,22 @@ def get_infoboxes(symbol, cls=None, fetcher=None):
     return infoboxes
 
 
+@request_memoized
+def _all_infoboxes(symbol, fetcher):
+    from wikipediabase.fetcher import WIKIBASE_FETCHER
+    from wikipediabase.infobox import InfoboxScraper
+
+    scraper = _context_get(symbol, "infoboxes", InfoboxScraper,
+                           fetcher=fetcher or WIKIBASE_FETCHER)
+    return scraper.infoboxes()
+
+
 def get_article(symbol, fetcher=None):
     from wikipediabase.article import Article
+    from wikipediabase.fetcher import WIKIBASE_FETCHER
 
-    return _context_get(symbol, "article", Article, fetcher)
+    return _context_get(symbol, "article", Article,
+                        fetcher=fetcher or WIKIBASE_FETCHER)
 
 
 def get_knowledgebase(**kw):
@@ -122,6 +262,14 @@ def get_knowledgebase(**kw):
     return ret
 
 
+def data_file(name):
+    """
+    The path of the data file name in DATA_DIR.
+    """
+
+    return os.path.join(DATA_DIR, name)
+
+
 def _get_persistent_dict(filename=DBM_FILE):
     """
     A dict that syncs with persistent data storage.
@@ -160,6 +308,9 @@ def _context_get(symbol, domain, cls, new=False, **kwargs):
     types and when calling get_<class>(<class instance>) have the
     right thing done.
 
+    Objects created with a fetcher keyword are kept apart for each
+    fetcher.
+
     :param symbol: The symbol for which an object is created.
     :param domain: The domain for which the object is created.
     :param cls: The class of the object.
@@ -175,8 +326,12 @@ def _context_get(symbol, domain, cls, new=False, **kwargs):
     if domain not in _CONTEXT:
         _CONTEXT[domain] = dict()
 
+    key = symbol
+    if 'fetcher' in kwargs:
+        key = (symbol, kwargs['fetcher'])
+
     if not new:
-        ret = _CONTEXT[domain].get(symbol, None)
+        ret = _CONTEXT[domain].get(key, None)
         if ret is not None:
             return ret
 
@@ -185,7 +340,7 @@ def _context_get(symbol, domain, cls, new=False, **kwargs):
     else:
         ret = cls(**kwargs)
 
-    _CONTEXT[domain][symbol] = ret
+    _CONTEXT[domain][key] = ret
     return ret
 
 
@@ -259,7 +414,7 @@ def fromstring(txt, literal_newlines=False):
         ret = copy.deepcopy(fromstring.memoized[txt])
     else:
         if literal_newlines:
-            txt = re.sub('<\s*br\s*/?>', u"\n", txt)
+            txt = HTML_BR_REGEX.sub(u"\n", txt)
             if not txt.strip():
                 return txt
 
@@ -301,8 +456,8 @@ def string_reduce(string):
     # symbol '"The Reckonging"' but we rduce user input as well.
 
     # First remove quotes so the stopwords turn up at the front
-    ret = re.sub(ur"([\W\s]+)", " ", string, flags=re.U | re.I).strip().lower()
-    return re.sub(ur"(^the|^a|^an)\b", "", ret, flags=re.U).strip()
+    ret = NON_WORD_REGEX.sub(" ", string).strip().lower()
+    return LEADING_ARTICLE_REGEX.sub("", ret).strip()
 
 
 def encode(txt):
@@ -311,7 +466,7 @@ def encode(txt):
 
 
 def markup_unlink(markup):
-    return re.sub(r"\[+(.*\||)(?P<content>.*?)\]+", r'\g<content>', markup)
+    return MARKUP_LINK_REGEX.sub(r'\g<content>', markup)
 
 
 def output(s):